@@ -8,7 +8,7 @@ import json
 import os
 import logging
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 
 # Logger per questo modulo
 logger = logging.getLogger("AutoBotOx.Config")
@@ -19,6 +19,12 @@ CONFIG_DIR = BASE_DIR / "config"
 DEFAULT_CONFIG_PATH = CONFIG_DIR / "default_config.json"
 USER_CONFIG_PATH = CONFIG_DIR / "user_config.json"
 
+# Segnaposto per i percorsi non trovati nella cache di ottieni()
+# (non possiamo usare None: potrebbe essere un valore valido)
+_MANCANTE = object()
+# Segnaposto per i percorsi che non esistono nella configurazione
+_NON_TROVATO = object()
+
 
 class GestoreImpostazioni:
     """
@@ -34,6 +40,9 @@ class GestoreImpostazioni:
         """Inizializza il gestore caricando le configurazioni."""
         logger.info("🔧 Inizializzazione GestoreImpostazioni...")
         self._config: dict = {}
+        # Cache dei valori letti con ottieni(): percorso -> valore
+        # Viene svuotata ad ogni modifica o ricaricamento della configurazione
+        self._cache: dict = {}
         self._carica_configurazione()
 
     def _carica_configurazione(self) -> None:
@@ -42,6 +51,8 @@ class GestoreImpostazioni:
         1. Legge il file default (sempre presente)
         2. Sovrascrive con il file utente (se esiste)
         """
+        self._cache.clear()
+
         # Passo 1: Carica configurazione predefinita
         try:
             with open(DEFAULT_CONFIG_PATH, "r", encoding="utf-8") as f:
@@ -93,6 +104,11 @@ class GestoreImpostazioni:
         Returns:
             Il valore trovato o il default
         """
+        # Percorso già letto: evitiamo split e navigazione del dizionario
+        valore = self._cache.get(percorso, _MANCANTE)
+        if valore is not _MANCANTE:
+            return default if valore is _NON_TROVATO else valore
+
         chiavi = percorso.split(".")
         valore = self._config
 
@@ -101,10 +117,59 @@ class GestoreImpostazioni:
                 valore = valore[chiave]
             else:
                 logger.debug(f"⚠️ Chiave non trovata nel percorso: {percorso}")
+                self._cache[percorso] = _NON_TROVATO
                 return default
 
+        self._cache[percorso] = valore
         return valore
 
+    def ottieni_bulk(self, richieste: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Ottiene più valori della configurazione in una sola chiamata.
+        
+        Utile all'avvio, quando servono tante impostazioni insieme: le
+        sezioni comuni (es. "provider_cloud") vengono navigate una volta sola
+        e i risultati finiscono nella stessa cache di ottieni().
+        
+        Esempio: ottieni_bulk({"sicurezza.auto_run": False, "provider_attivo": "locale"})
+        
+        Args:
+            richieste: Dizionario {percorso: valore di default}
+            
+        Returns:
+            Dizionario {percorso: valore trovato o default}
+        """
+        cache = self._cache
+        risultati: Dict[str, Any] = {}
+        # Nodi intermedi già navigati in questa chiamata ("sicurezza" -> dict)
+        sezioni: Dict[str, Any] = {"": self._config}
+
+        for percorso, default in richieste.items():
+            valore = cache.get(percorso, _MANCANTE)
+            if valore is _MANCANTE:
+                genitore, _, chiave = percorso.rpartition(".")
+                nodo = sezioni.get(genitore, _MANCANTE)
+                if nodo is _MANCANTE:
+                    nodo = self._config
+                    for parte in genitore.split("."):
+                        if isinstance(nodo, dict) and parte in nodo:
+                            nodo = nodo[parte]
+                        else:
+                            nodo = _NON_TROVATO
+                            break
+                    sezioni[genitore] = nodo
+
+                if isinstance(nodo, dict) and chiave in nodo:
+                    valore = nodo[chiave]
+                else:
+                    logger.debug(f"⚠️ Chiave non trovata nel percorso: {percorso}")
+                    valore = _NON_TROVATO
+                cache[percorso] = valore
+
+            risultati[percorso] = default if valore is _NON_TROVATO else valore
+
+        return risultati
+
     def imposta(self, percorso: str, valore: Any) -> None:
         """
         Imposta un valore nella configurazione e salva automaticamente.
@@ -126,6 +191,7 @@ class GestoreImpostazioni:
 
         # Imposta il valore finale
         config[chiavi[-1]] = valore
+        self._cache.clear()
         logger.info(f"✅ Impostazione aggiornata: {percorso} = {valore}")
 
         # Salva automaticamente nel file utente
@@ -136,6 +202,8 @@ class GestoreImpostazioni:
         Salva la configurazione corrente nel file utente.
         Non modifica mai il file di configurazione predefinito!
         """
+        self._cache.clear()
+
         try:
             # Assicurati che la cartella config esista
             CONFIG_DIR.mkdir(parents=True, exist_ok=True)
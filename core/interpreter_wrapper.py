@@ -12,7 +12,7 @@ import queue
 import time
 import logging
 import os
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Iterator
 from dataclasses import dataclass
 from enum import Enum
 
@@ -57,7 +57,8 @@ class WrapperInterpreter:
     1. La GUI manda un messaggio tramite invia_messaggio("ciao")
     2. Il wrapper avvia un thread separato che chiama interpreter.chat()
     3. Man mano che l'IA risponde, i pezzi di risposta vengono messi in una CODA
-    4. La GUI legge dalla coda ogni 100ms e aggiorna la schermata
+    4. La GUI viene "svegliata" quando arrivano pezzi nuovi, legge dalla coda
+       e aggiorna la schermata
     5. Se l'utente preme STOP, il thread viene interrotto
     
     La CODA (queue) è come una fila al supermercato: i messaggi si mettono
@@ -72,6 +73,11 @@ class WrapperInterpreter:
         # Coda per passare messaggi dal thread dell'interprete alla GUI
         self._coda_messaggi: queue.Queue = queue.Queue()
 
+        # Callback per "svegliare" la GUI quando arrivano messaggi nuovi
+        # (chiamato dal thread che produce il messaggio!)
+        self._callback_nuovi_messaggi: Optional[Callable[[], None]] = None
+        self._notifica_pendente: bool = False  # Sveglia già inviata e non ancora letta?
+
         # Thread dove gira l'interprete
         self._thread_interprete: Optional[threading.Thread] = None
 
@@ -225,14 +231,14 @@ REGOLE COMPUTER USE:
 
         except ImportError as ie:
             logger.error(f"❌ Libreria 'open-interpreter' non trovata! Errore: {ie}")
-            self._coda_messaggi.put(MessaggioInterpreter(
+            self._metti_messaggio(MessaggioInterpreter(
                 tipo=TipoMessaggio.ERRORE,
                 contenuto=f"Libreria 'open-interpreter' non installata!\nInstalla con: pip install open-interpreter\nDettaglio: {ie}"
             ))
             return False
         except Exception as e:
             logger.error(f"❌ Errore inizializzazione interpreter: {e}")
-            self._coda_messaggi.put(MessaggioInterpreter(
+            self._metti_messaggio(MessaggioInterpreter(
                 tipo=TipoMessaggio.ERRORE,
                 contenuto=f"Errore inizializzazione: {str(e)}"
             ))
@@ -456,7 +462,7 @@ REGOLE COMPUTER USE:
         """
         if self._interpreter is None:
             logger.error("❌ Interpreter non inizializzato!")
-            self._coda_messaggi.put(MessaggioInterpreter(
+            self._metti_messaggio(MessaggioInterpreter(
                 tipo=TipoMessaggio.ERRORE,
                 contenuto="Interprete non inizializzato! Configura prima un provider."
             ))
@@ -464,7 +470,7 @@ REGOLE COMPUTER USE:
 
         if self._in_esecuzione:
             logger.warning("⚠️ Interprete già in esecuzione, attendi...")
-            self._coda_messaggi.put(MessaggioInterpreter(
+            self._metti_messaggio(MessaggioInterpreter(
                 tipo=TipoMessaggio.ERRORE,
                 contenuto="L'interprete sta già elaborando un messaggio. Attendi o premi STOP."
             ))
@@ -493,7 +499,7 @@ REGOLE COMPUTER USE:
         self._in_esecuzione = True
 
         # Notifica lo stato "in elaborazione"
-        self._coda_messaggi.put(MessaggioInterpreter(
+        self._metti_messaggio(MessaggioInterpreter(
             tipo=TipoMessaggio.STATO,
             contenuto="Elaborazione in corso..."
         ))
@@ -545,7 +551,7 @@ REGOLE COMPUTER USE:
                 # Controlla se l'utente ha premuto STOP
                 if self._stop_richiesto:
                     logger.info("🛑 Elaborazione interrotta dall'utente")
-                    self._coda_messaggi.put(MessaggioInterpreter(
+                    self._metti_messaggio(MessaggioInterpreter(
                         tipo=TipoMessaggio.STATO,
                         contenuto="⚠️ Elaborazione interrotta dall'utente"
                     ))
@@ -587,7 +593,7 @@ REGOLE COMPUTER USE:
                     if testo:
                         messaggio_accumulato += testo
                         # Invia ogni pezzo per lo streaming in tempo reale
-                        self._coda_messaggi.put(MessaggioInterpreter(
+                        self._metti_messaggio(MessaggioInterpreter(
                             tipo=TipoMessaggio.TESTO,
                             contenuto=testo,
                             ruolo="assistant"
@@ -608,7 +614,7 @@ REGOLE COMPUTER USE:
                 if "output" in chunk:
                     output = chunk["output"]
                     if output:
-                        self._coda_messaggi.put(MessaggioInterpreter(
+                        self._metti_messaggio(MessaggioInterpreter(
                             tipo=TipoMessaggio.OUTPUT_CONSOLE,
                             contenuto=output,
                             ruolo="computer"
@@ -625,7 +631,7 @@ REGOLE COMPUTER USE:
 
                     if codice_exec:
                         # Mostra il codice nel terminale GUI
-                        self._coda_messaggi.put(MessaggioInterpreter(
+                        self._metti_messaggio(MessaggioInterpreter(
                             tipo=TipoMessaggio.CODICE,
                             contenuto=codice_exec,
                             linguaggio=lang_exec
@@ -638,7 +644,7 @@ REGOLE COMPUTER USE:
                             self._approvazione_risposta = None
 
                             # Invia richiesta di approvazione alla GUI
-                            self._coda_messaggi.put(MessaggioInterpreter(
+                            self._metti_messaggio(MessaggioInterpreter(
                                 tipo=TipoMessaggio.APPROVAZIONE,
                                 contenuto=codice_exec,
                                 linguaggio=lang_exec
@@ -659,7 +665,7 @@ REGOLE COMPUTER USE:
                             # interrompiamo il generatore -> il codice NON verrà eseguito
                             if self._approvazione_risposta is not True or self._stop_richiesto:
                                 logger.info("❌ Codice RIFIUTATO dall'utente, non eseguito")
-                                self._coda_messaggi.put(MessaggioInterpreter(
+                                self._metti_messaggio(MessaggioInterpreter(
                                     tipo=TipoMessaggio.STATO,
                                     contenuto="⚠️ Esecuzione codice rifiutata dall'utente"
                                 ))
@@ -675,7 +681,7 @@ REGOLE COMPUTER USE:
                         self._cronologia.append(msg)
 
             # Notifica che l'elaborazione è terminata
-            self._coda_messaggi.put(MessaggioInterpreter(
+            self._metti_messaggio(MessaggioInterpreter(
                 tipo=TipoMessaggio.STATO,
                 contenuto="Elaborazione completata",
                 completo=True
@@ -725,7 +731,7 @@ REGOLE COMPUTER USE:
                     "3. Verificare la API key"
                 )
             
-            self._coda_messaggi.put(MessaggioInterpreter(
+            self._metti_messaggio(MessaggioInterpreter(
                 tipo=TipoMessaggio.ERRORE,
                 contenuto=msg_utente
             ))
@@ -755,7 +761,7 @@ REGOLE COMPUTER USE:
             logger.error(f"❌ Errore durante emergency stop: {e}")
 
         # Notifica la GUI
-        self._coda_messaggi.put(MessaggioInterpreter(
+        self._metti_messaggio(MessaggioInterpreter(
             tipo=TipoMessaggio.STATO,
             contenuto="🚨 STOP DI EMERGENZA - Tutti i processi interrotti"
         ))
@@ -780,19 +786,82 @@ REGOLE COMPUTER USE:
     def leggi_messaggi(self) -> List[MessaggioInterpreter]:
         """
         Legge tutti i messaggi disponibili dalla coda.
-        Chiamata periodicamente dalla GUI (ogni ~100ms).
         
         Returns:
             Lista di messaggi da visualizzare
         """
-        messaggi = []
-        while not self._coda_messaggi.empty():
+        return list(self.scarica_messaggi())
+
+    def scarica_messaggi(self) -> Iterator[MessaggioInterpreter]:
+        """
+        Estrae uno alla volta i messaggi presenti nella coda.
+        Chiamata periodicamente dalla GUI, senza creare liste intermedie
+        (a coda vuota non alloca nulla).
+        
+        Estrae al massimo i messaggi presenti all'inizio della lettura:
+        quelli che arrivano nel frattempo restano per il giro successivo,
+        così uno streaming molto veloce non blocca la GUI.
+        
+        Yields:
+            Messaggi da visualizzare, in ordine di arrivo
+        """
+        coda = self._coda_messaggi
+        try:
+            for _ in range(coda.qsize()):
+                yield coda.get_nowait()
+        except queue.Empty:
+            return
+
+    def ha_messaggi(self) -> bool:
+        """Restituisce True se ci sono messaggi in attesa nella coda."""
+        return not self._coda_messaggi.empty()
+
+    @property
+    def messaggi_in_coda(self) -> int:
+        """Restituisce il numero (approssimativo) di messaggi in attesa nella coda."""
+        return self._coda_messaggi.qsize()
+
+    def _metti_messaggio(self, messaggio: MessaggioInterpreter) -> None:
+        """
+        Mette un messaggio nella coda e sveglia la GUI se necessario.
+        
+        Le sveglie vengono raggruppate: finché la GUI non ha letto la coda
+        (conferma_notifica), i messaggi successivi non generano altre sveglie.
+        
+        Args:
+            messaggio: Il messaggio da accodare
+        """
+        self._coda_messaggi.put(messaggio)
+
+        if self._callback_nuovi_messaggi and not self._notifica_pendente:
+            self._notifica_pendente = True
             try:
-                msg = self._coda_messaggi.get_nowait()
-                messaggi.append(msg)
-            except queue.Empty:
-                break
-        return messaggi
+                self._callback_nuovi_messaggi()
+            except Exception as e:
+                self._notifica_pendente = False
+                logger.error(f"❌ Errore nel callback nuovi messaggi: {e}")
+
+    def imposta_callback_messaggi(self, callback: Optional[Callable[[], None]]) -> None:
+        """
+        Imposta la funzione chiamata quando arrivano nuovi messaggi nella coda.
+        
+        ATTENZIONE: il callback viene chiamato dal thread dell'interprete,
+        quindi deve solo pianificare la lettura nel thread della GUI
+        (es. con after()), non toccare direttamente i widget.
+        
+        Args:
+            callback: Funzione senza argomenti, o None per disattivare
+        """
+        self._callback_nuovi_messaggi = callback
+        self._notifica_pendente = False
+
+    def conferma_notifica(self) -> None:
+        """
+        Segnala che la GUI sta per leggere la coda.
+        Va chiamata PRIMA di scarica_messaggi(), così un messaggio arrivato
+        durante la lettura genera una nuova sveglia invece di perdersi.
+        """
+        self._notifica_pendente = False
 
     def imposta_auto_run(self, valore: bool) -> None:
         """
@@ -832,12 +901,13 @@ REGOLE COMPUTER USE:
             self._interpreter.messages = []
         self._cronologia.clear()
 
-        # Svuota la coda
-        while not self._coda_messaggi.empty():
-            try:
-                self._coda_messaggi.get_nowait()
-            except queue.Empty:
-                break
+        # Svuota la coda in un colpo solo: un solo lock invece di N get_nowait()
+        coda = self._coda_messaggi
+        with coda.mutex:
+            coda.queue.clear()
+            coda.unfinished_tasks = 0
+            coda.all_tasks_done.notify_all()
+            coda.not_full.notify_all()
 
         logger.info("🆕 Nuova conversazione iniziata")
 
@@ -51,6 +51,15 @@ class GestoreProvider:
         """Inizializza il gestore con i provider vuoti."""
         self._providers: Dict[str, ConfigProvider] = {}
         self._provider_attivo: str = "locale"
+
+        # Cache del provider attivo: ricalcolata solo quando cambia
+        # la selezione o vengono registrati i provider
+        self._config_attiva_cache: Optional[ConfigProvider] = None
+        self._nome_attivo_cache: str = "Nessuno"
+
+        # URL pingato dall'health check del server locale (calcolato
+        # una volta sola quando si registra il provider locale)
+        self._url_health_check: str = "http://localhost:1234/v1/models"
         logger.info("🔌 GestoreProvider inizializzato")
 
     def registra_locale(
@@ -78,6 +87,8 @@ class GestoreProvider:
             timeout=timeout,
             contesto_max=16384  # LM Studio supporta 8k-32k, usiamo 16k come default
         )
+        self._url_health_check = api_base.rstrip("/") + "/models"
+        self._aggiorna_cache_attiva()
         logger.info(f"✅ Provider locale registrato: {api_base} - Modello: {modello}")
 
     def registra_cloud(
@@ -105,6 +116,7 @@ class GestoreProvider:
             timeout=timeout,
             contesto_max=64000  # DeepSeek R1 ha un contesto molto grande
         )
+        self._aggiorna_cache_attiva()
         logger.info(f"✅ Provider cloud registrato: {api_base} - Modello: {modello}")
 
     def seleziona_provider(self, tipo: str) -> bool:
@@ -122,10 +134,16 @@ class GestoreProvider:
             return False
 
         self._provider_attivo = tipo
-        provider = self._providers[tipo]
-        logger.info(f"🔄 Provider selezionato: {provider.nome}")
+        self._aggiorna_cache_attiva()
+        logger.info(f"🔄 Provider selezionato: {self._nome_attivo_cache}")
         return True
 
+    def _aggiorna_cache_attiva(self) -> None:
+        """Ricalcola la cache del provider attivo (config e nome leggibile)."""
+        config = self._providers.get(self._provider_attivo)
+        self._config_attiva_cache = config
+        self._nome_attivo_cache = config.nome if config else "Nessuno"
+
     def ottieni_config_attiva(self) -> Optional[ConfigProvider]:
         """
         Restituisce la configurazione del provider attualmente selezionato.
@@ -133,11 +151,10 @@ class GestoreProvider:
         Returns:
             ConfigProvider del provider attivo, o None se non configurato
         """
-        if self._provider_attivo not in self._providers:
+        config = self._config_attiva_cache
+        if config is None:
             logger.error(f"❌ Nessun provider attivo configurato")
-            return None
-
-        return self._providers[self._provider_attivo]
+        return config
 
     def ottieni_config_interpreter(self) -> Dict[str, Any]:
         """
@@ -173,8 +190,12 @@ class GestoreProvider:
     @property
     def provider_attivo_nome(self) -> str:
         """Restituisce il nome leggibile del provider attivo."""
-        config = self.ottieni_config_attiva()
-        return config.nome if config else "Nessuno"
+        return self._nome_attivo_cache
+
+    @property
+    def url_health_check(self) -> str:
+        """Restituisce l'URL da pingare per sapere se il server locale è attivo."""
+        return self._url_health_check
 
     @property
     def provider_attivo_tipo(self) -> str:
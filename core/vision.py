@@ -37,6 +37,11 @@ MAX_ALTEZZA = 720
 # Qualità JPEG (0-100) - più bassa = meno token ma meno qualità
 QUALITA_JPEG = 60
 
+# Parametri encoder JPEG precalcolati (riusati ad ogni cattura)
+# optimize=False evita il secondo passaggio Huffman, che costa CPU
+# ad ogni screenshot per qualche KB risparmiato
+_PARAMETRI_JPEG = {"quality": QUALITA_JPEG, "optimize": False, "progressive": False}
+
 
 def abilita_vision(abilitata: bool = True) -> None:
     """
@@ -79,7 +84,7 @@ def cattura_screenshot() -> Optional[str]:
         
         # Converti in JPEG base64 (JPEG è molto più leggero di PNG)
         buffer = io.BytesIO()
-        img.save(buffer, format="JPEG", quality=QUALITA_JPEG, optimize=True)
+        _salva_jpeg(img, buffer)
         buffer.seek(0)
         
         # Codifica in base64
@@ -99,6 +104,31 @@ def cattura_screenshot() -> Optional[str]:
         return None
 
 
+def _salva_jpeg(img, buffer: io.BytesIO) -> None:
+    """
+    Salva l'immagine in JPEG nel buffer saltando il dispatch di Image.save().
+    
+    Image.save() cerca il formato nel registro dei plugin e rielabora i
+    parametri ad ogni chiamata: qui chiamiamo direttamente l'encoder
+    JpegImagePlugin._save con i parametri già pronti. Se l'API interna di
+    PIL cambia, ripieghiamo sul normale Image.save().
+    
+    Args:
+        img: Oggetto PIL Image (RGB)
+        buffer: Buffer in memoria dove scrivere il JPEG
+    """
+    try:
+        from PIL import JpegImagePlugin
+        img.encoderinfo = dict(_PARAMETRI_JPEG)
+        img.encoderconfig = ()
+        JpegImagePlugin._save(img, buffer, "screenshot.jpg")
+    except Exception as e:
+        logger.debug(f"⚠️ Encoder JPEG diretto non disponibile, uso Image.save: {e}")
+        buffer.seek(0)
+        buffer.truncate()
+        img.save(buffer, format="JPEG", **_PARAMETRI_JPEG)
+
+
 def imposta_screenshot_pendente(base64_img: Optional[str] = None) -> None:
     """
     Imposta uno screenshot da inviare con il prossimo messaggio.
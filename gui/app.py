@@ -10,24 +10,21 @@
 # ============================================
 
 import logging
+import threading
+from functools import partial
 import customtkinter as ctk
-from tkinter import filedialog
-from typing import Optional
+from typing import List, Optional, Tuple
 
 # Importa i componenti della GUI
 from gui.sidebar import Sidebar
 from gui.chat_view import ChatView
 from gui.terminal_view import TerminalView
 from gui.status_bar import StatusBar
-from gui.dialogs import (
-    DialogoErrore,
-    DialogoConferma,
-    DialogoDebug,
-    DialogoApprovazioneCodice
-)
+# NOTA: i dialoghi (gui.dialogs), tkinter.filedialog e l'esportatore
+# cronologia vengono importati solo quando servono, per un avvio più rapido
 
 # Importa i moduli core
-from core.interpreter_wrapper import WrapperInterpreter, TipoMessaggio
+from core.interpreter_wrapper import WrapperInterpreter, TipoMessaggio, MessaggioInterpreter
 from core.provider_manager import GestoreProvider
 from core.health_check import ControlloSalute
 from core import computer_use
@@ -36,13 +33,20 @@ from core import vision
 # Importa le utilità
 from config.settings import GestoreImpostazioni
 from utils.token_counter import ContaToken
-from utils.history_export import EsportaCronologia
 
 # Logger per questo modulo
 logger = logging.getLogger("AutoBotOx.GUI.App")
 
 # Intervallo in millisecondi per il polling della coda messaggi
+# Il polling è adattivo: parte da INTERVALLO_POLLING_MS, scende al minimo
+# quando arrivano messaggi (streaming) e raddoppia fino al massimo a riposo
 INTERVALLO_POLLING_MS = 100
+INTERVALLO_POLLING_MIN_MS = 15
+INTERVALLO_POLLING_MAX_MS = 500
+
+# Ritardo (ms) prima di mostrare un cambio di stato del server locale,
+# per assorbire i "rimbalzi" rapidi online/offline dell'health check
+RITARDO_STATO_SERVER_MS = 300
 
 
 class AppAutoBot(ctk.CTk):
@@ -85,15 +89,47 @@ class AppAutoBot(ctk.CTk):
         # Contatore token (per OpenRouter)
         self._token_counter = ContaToken()
 
-        # Esportatore cronologia
-        self._exporter = EsportaCronologia()
+        # Stato del polling adattivo della coda messaggi
+        self._intervallo_polling: int = INTERVALLO_POLLING_MS
+        self._in_streaming: bool = False  # Ultimo STATO ricevuto era "in corso"?
+        # Il polling è un "servizio" registrato una volta sola: il metodo
+        # legato viene creato qui e riusato ad ogni tick, e _on_chiusura
+        # lo disattiva annullando il timer in attesa
+        self._polling_attivo: bool = True
+        self._callback_polling = self._avvia_polling
+        self._after_polling: Optional[str] = None
+
+        # Pezzi di testo/output accumulati durante un tick di polling
+        self._buffer_testo: List[str] = []
+        self._buffer_output: List[str] = []
+
+        # Callback di approvazione/rifiuto codice, condivisi da chat e dialogo
+        self._callback_approva_codice = partial(self._on_decisione_codice, True)
+        self._callback_rifiuta_codice = partial(self._on_decisione_codice, False)
+
+        # Tabella di dispatch: tipo di messaggio -> gestore
+        # (una sola ricerca nel dizionario invece di una catena di if/elif)
+        self._gestori_messaggio = {
+            TipoMessaggio.TESTO: self._gestisci_testo,
+            TipoMessaggio.CODICE: self._gestisci_codice,
+            TipoMessaggio.OUTPUT_CONSOLE: self._gestisci_output,
+            TipoMessaggio.ERRORE: self._gestisci_errore,
+            TipoMessaggio.STATO: self._gestisci_stato,
+            TipoMessaggio.APPROVAZIONE: self._gestisci_approvazione,
+        }
+
+        # Stato del server locale: ultimo ricevuto, ultimo mostrato
+        # e aggiornamento GUI in attesa (vedi _on_cambio_stato_server)
+        self._stato_server_richiesto: Optional[bool] = None
+        self._stato_server_mostrato: Optional[bool] = None
+        self._after_stato_server: Optional[str] = None
 
         # Health check del server locale
+        # L'URL è già composto dal gestore provider (provider locale)
+        ottieni = self._impostazioni.ottieni
         self._health_check = ControlloSalute(
-            url_server=self._impostazioni.ottieni(
-                "provider_locale.api_base", "http://localhost:1234/v1"
-            ) + "/models",
-            intervallo_secondi=self._impostazioni.ottieni(
+            url_server=self._provider_manager.url_health_check,
+            intervallo_secondi=ottieni(
                 "health_check.intervallo_secondi", 5
             ),
             callback_stato=self._on_cambio_stato_server
@@ -106,7 +142,7 @@ class AppAutoBot(ctk.CTk):
         self.title("AutoBot Ox - AI Agent Desktop v1.0.0")
         
         # Dimensioni finestra
-        dimensioni = self._impostazioni.ottieni("interfaccia.dimensione_finestra", "1400x900")
+        dimensioni = ottieni("interfaccia.dimensione_finestra", "1400x900")
         self.geometry(dimensioni)
         self.minsize(1000, 600)
 
@@ -119,6 +155,14 @@ class AppAutoBot(ctk.CTk):
         # ==========================================
         self._costruisci_layout()
 
+        # Metodi dei widget usati ad ogni messaggio: li leghiamo una volta
+        # sola per evitare la doppia ricerca di attributo nel ciclo caldo
+        self._fn_streaming = self._chat_view.aggiungi_testo_streaming
+        self._fn_output = self._terminal_view.scrivi_output
+        self._fn_errore = self._terminal_view.scrivi_errore
+        self._fn_codice = self._terminal_view.scrivi_codice
+        self._fn_token = self._status_bar.aggiorna_token
+
         # ==========================================
         # Carica le impostazioni salvate nella GUI
         # ==========================================
@@ -131,7 +175,9 @@ class AppAutoBot(ctk.CTk):
         # Avvia il health check del server locale
         self._health_check.avvia()
 
-        # Avvia il polling della coda messaggi
+        # Avvia il polling della coda messaggi e la sveglia immediata
+        # quando l'interprete produce un messaggio
+        self._interpreter.imposta_callback_messaggi(self._on_nuovi_messaggi)
         self._avvia_polling()
 
         # Inizializza l'interprete con il provider corrente
@@ -157,9 +203,10 @@ class AppAutoBot(ctk.CTk):
         """
         # Configura il grid layout principale
         self.grid_columnconfigure(0, weight=0)  # Sidebar: larghezza fissa
-        self.grid_columnconfigure(1, weight=1)  # Area principale: espandibile
-        self.grid_rowconfigure(0, weight=1)     # Area principale: espandibile
-        self.grid_rowconfigure(1, weight=0)     # Status bar: altezza fissa
+        self.grid_columnconfigure(1, weight=1)  # Chat + Terminal: espandibili
+        self.grid_rowconfigure(0, weight=3)     # Chat: 3/4 dello spazio
+        self.grid_rowconfigure(1, weight=1)     # Terminal: 1/4 dello spazio
+        self.grid_rowconfigure(2, weight=0)     # Status bar: altezza fissa
 
         # ========== SIDEBAR ==========
         self._sidebar = Sidebar(
@@ -173,97 +220,100 @@ class AppAutoBot(ctk.CTk):
             callback_export=self._on_export_cronologia,
             callback_salva_apikey=self._on_salva_apikey
         )
-        self._sidebar.grid(row=0, column=0, sticky="nsw")
+        self._sidebar.grid(row=0, column=0, rowspan=2, sticky="nsw")
 
         # ========== AREA PRINCIPALE (Chat + Terminal) ==========
-        # Usiamo un PanedWindow per permettere il ridimensionamento
-        area_principale = ctk.CTkFrame(self, fg_color="transparent")
-        area_principale.grid(row=0, column=1, sticky="nsew", padx=0, pady=0)
-        area_principale.grid_rowconfigure(0, weight=3)  # Chat: 3/4 dello spazio
-        area_principale.grid_rowconfigure(1, weight=1)  # Terminal: 1/4 dello spazio
-        area_principale.grid_columnconfigure(0, weight=1)
+        # Chat e Terminal stanno direttamente nella griglia della finestra:
+        # niente frame contenitore, un widget in meno da ricalcolare
+        # ad ogni ridimensionamento
 
         # Chat View
         self._chat_view = ChatView(
-            area_principale,
+            self,
             callback_invia=self._on_invia_messaggio,
             callback_stop=self._on_emergency_stop,
-            callback_approva=self._on_approva_codice,
-            callback_rifiuta=self._on_rifiuta_codice
+            callback_approva=self._callback_approva_codice,
+            callback_rifiuta=self._callback_rifiuta_codice
         )
-        self._chat_view.grid(row=0, column=0, sticky="nsew", padx=0, pady=0)
+        self._chat_view.grid(row=0, column=1, sticky="nsew", padx=0, pady=0)
 
         # Terminal View
-        self._terminal_view = TerminalView(area_principale)
-        self._terminal_view.grid(row=1, column=0, sticky="nsew", padx=0, pady=(2, 0))
+        self._terminal_view = TerminalView(self)
+        self._terminal_view.grid(row=1, column=1, sticky="nsew", padx=0, pady=(2, 0))
 
         # ========== STATUS BAR ==========
         self._status_bar = StatusBar(self)
-        self._status_bar.grid(row=1, column=0, columnspan=2, sticky="sew")
+        self._status_bar.grid(row=2, column=0, columnspan=2, sticky="sew")
 
         logger.info("📐 Layout costruito")
 
     def _configura_providers(self) -> None:
         """Configura i provider LLM dalle impostazioni."""
+        # Tutte le impostazioni dei provider in una sola lettura
+        valori = self._impostazioni.ottieni_bulk({
+            "provider_locale.api_base": "http://localhost:1234/v1",
+            "provider_locale.modello": "openai/local",
+            "provider_locale.timeout_secondi": 30,
+            "provider_cloud.api_base": "https://openrouter.ai/api/v1",
+            "provider_cloud.modello": "openrouter/deepseek/deepseek-r1-0528:free",
+            "provider_cloud.api_key": "",
+            "provider_cloud.timeout_secondi": 60,
+            "provider_attivo": "locale",
+        })
+
         # Provider Locale
         self._provider_manager.registra_locale(
-            api_base=self._impostazioni.ottieni(
-                "provider_locale.api_base", "http://localhost:1234/v1"
-            ),
-            modello=self._impostazioni.ottieni(
-                "provider_locale.modello", "openai/local"
-            ),
-            timeout=self._impostazioni.ottieni(
-                "provider_locale.timeout_secondi", 30
-            )
+            api_base=valori["provider_locale.api_base"],
+            modello=valori["provider_locale.modello"],
+            timeout=valori["provider_locale.timeout_secondi"]
         )
 
         # Provider Cloud (OpenRouter)
         self._provider_manager.registra_cloud(
-            api_base=self._impostazioni.ottieni(
-                "provider_cloud.api_base", "https://openrouter.ai/api/v1"
-            ),
-            modello=self._impostazioni.ottieni(
-                "provider_cloud.modello", "openrouter/deepseek/deepseek-r1-0528:free"
-            ),
-            api_key=self._impostazioni.ottieni(
-                "provider_cloud.api_key", ""
-            ),
-            timeout=self._impostazioni.ottieni(
-                "provider_cloud.timeout_secondi", 60
-            )
+            api_base=valori["provider_cloud.api_base"],
+            modello=valori["provider_cloud.modello"],
+            api_key=valori["provider_cloud.api_key"],
+            timeout=valori["provider_cloud.timeout_secondi"]
         )
 
         # Seleziona il provider attivo
-        provider_attivo = self._impostazioni.ottieni("provider_attivo", "locale")
+        provider_attivo = valori["provider_attivo"]
         self._provider_manager.seleziona_provider(provider_attivo)
 
         logger.info("🔌 Provider configurati")
 
     def _carica_impostazioni_gui(self) -> None:
         """Carica le impostazioni salvate e le applica alla GUI."""
+        valori = self._impostazioni.ottieni_bulk({
+            "provider_attivo": "locale",
+            "provider_cloud.api_key": "",
+            "sicurezza.auto_run": False,
+            "sicurezza.computer_use": False,
+            "sicurezza.vision": False,
+        })
+
         # Provider attivo
-        provider = self._impostazioni.ottieni("provider_attivo", "locale")
+        provider = valori["provider_attivo"]
         self._sidebar.imposta_provider(provider)
 
         # API key
-        api_key = self._impostazioni.api_key_openrouter
+        api_key = valori["provider_cloud.api_key"]
         if api_key:
             self._sidebar.imposta_apikey(api_key)
 
         # Auto-run
-        auto_run = self._impostazioni.auto_run
+        auto_run = valori["sicurezza.auto_run"]
         self._sidebar.imposta_autorun(auto_run)
 
         # Computer Use (controllo mouse/tastiera)
-        cu_attivo = self._impostazioni.ottieni("sicurezza.computer_use", False)
+        cu_attivo = valori["sicurezza.computer_use"]
         self._sidebar.imposta_computer_use(cu_attivo)
         if cu_attivo:
             computer_use.abilita_computer_use(True)
             logger.info("🖱️ Computer Use ripristinato: ATTIVO")
 
         # Vision (screenshot al modello)
-        vis_attivo = self._impostazioni.ottieni("sicurezza.vision", False)
+        vis_attivo = valori["sicurezza.vision"]
         self._sidebar.imposta_vision(vis_attivo)
         if vis_attivo:
             vision.abilita_vision(True)
@@ -287,7 +337,7 @@ class AppAutoBot(ctk.CTk):
             # Verifica che la configurazione sia valida
             valido, messaggio = self._provider_manager.verifica_config_valida()
             if not valido:
-                logger.warning(f"⚠️ Config non valida: {messaggio}")
+                logger.warning("⚠️ Config non valida: %s", messaggio)
                 self._terminal_view.scrivi_log(f"⚠️ {messaggio}")
                 return
 
@@ -315,69 +365,189 @@ class AppAutoBot(ctk.CTk):
         """
         Avvia il polling periodico della coda messaggi.
         
-        Ogni INTERVALLO_POLLING_MS millisecondi, controlla se ci sono
-        nuovi messaggi dall'interprete e li visualizza nella GUI.
+        Controlla se ci sono nuovi messaggi dall'interprete e li visualizza
+        nella GUI. L'intervallo è adattivo: INTERVALLO_POLLING_MIN_MS mentre
+        l'IA sta rispondendo (streaming più fluido), poi raddoppia ad ogni
+        giro a vuoto fino a INTERVALLO_POLLING_MAX_MS (meno CPU a riposo).
+        """
+        if not self._polling_attivo:
+            return
+
+        self._interpreter.conferma_notifica()
+
+        # Caso più comune (a riposo): coda vuota, non serve processare nulla
+        if self._interpreter.ha_messaggi():
+            n_messaggi, in_streaming = self._processa_messaggi()
+        else:
+            n_messaggi = 0
+            in_streaming = self._in_streaming = (
+                self._in_streaming and self._interpreter.is_in_esecuzione
+            )
+
+        if n_messaggi or in_streaming:
+            self._intervallo_polling = INTERVALLO_POLLING_MIN_MS
+        else:
+            self._intervallo_polling = min(
+                self._intervallo_polling * 2, INTERVALLO_POLLING_MAX_MS
+            )
+
+        self._after_polling = self.after(self._intervallo_polling, self._callback_polling)
+
+    def _ferma_polling(self) -> None:
+        """Disattiva il polling della coda messaggi e annulla il timer in attesa."""
+        self._polling_attivo = False
+        self._interpreter.imposta_callback_messaggi(None)
+        if self._after_polling is not None:
+            self.after_cancel(self._after_polling)
+            self._after_polling = None
+
+    def _on_nuovi_messaggi(self) -> None:
+        """
+        Callback: l'interprete ha messo nuovi messaggi nella coda.
+        Viene chiamato dal thread dell'interprete, quindi usiamo after()
+        per leggere la coda nel thread principale della GUI.
+        
+        Aspettiamo INTERVALLO_POLLING_MIN_MS per raggruppare i pezzi di
+        streaming arrivati nel frattempo in un solo aggiornamento.
         """
-        self._processa_messaggi()
-        self.after(INTERVALLO_POLLING_MS, self._avvia_polling)
+        try:
+            self.after(INTERVALLO_POLLING_MIN_MS, self._leggi_coda_da_notifica)
+        except RuntimeError:
+            # La finestra è già stata distrutta (chiusura in corso)
+            pass
+
+    def _leggi_coda_da_notifica(self) -> None:
+        """Legge la coda messaggi in risposta a una sveglia dell'interprete."""
+        if not self._polling_attivo:
+            return
 
-    def _processa_messaggi(self) -> None:
+        self._interpreter.conferma_notifica()
+        if not self._interpreter.ha_messaggi():
+            return
+
+        n_messaggi, _ = self._processa_messaggi()
+        if n_messaggi:
+            # C'è attività: il prossimo giro di polling torna veloce
+            self._intervallo_polling = INTERVALLO_POLLING_MIN_MS
+
+    def _processa_messaggi(self) -> Tuple[int, bool]:
         """
         Legge e processa tutti i messaggi disponibili nella coda.
         
         Questo è il "ponte" tra il thread dell'interprete e la GUI.
+        Ogni tipo di messaggio ha il suo gestore in self._gestori_messaggio.
+        
+        Returns:
+            Tupla (numero messaggi processati, elaborazione ancora in corso)
         """
-        messaggi = self._interpreter.leggi_messaggi()
+        gestori = self._gestori_messaggio
+        n_messaggi = 0
+        token_input = 0
+        token_output = 0
 
-        for msg in messaggi:
+        for msg in self._interpreter.scarica_messaggi():
+            n_messaggi += 1
             try:
-                if msg.tipo == TipoMessaggio.TESTO:
-                    # Testo dall'IA - aggiungi come streaming
-                    self._chat_view.aggiungi_testo_streaming(msg.contenuto)
-                    self._chat_view.aggiorna_stato("🤖 Sta scrivendo...")
-
-                elif msg.tipo == TipoMessaggio.CODICE:
-                    # Codice - mostra nel terminale
-                    self._terminal_view.scrivi_codice(msg.contenuto, msg.linguaggio)
-                    self._chat_view.aggiungi_messaggio(
-                        "assistant",
-                        f"💻 Codice ({msg.linguaggio}):\n{msg.contenuto}",
-                        tipo="code"
-                    )
-
-                elif msg.tipo == TipoMessaggio.OUTPUT_CONSOLE:
-                    # Output console - mostra nel terminale
-                    self._terminal_view.scrivi_output(msg.contenuto)
-
-                elif msg.tipo == TipoMessaggio.ERRORE:
-                    # Errore - mostra sia nel terminale che nella chat
-                    self._terminal_view.scrivi_errore(msg.contenuto)
-                    self._chat_view.aggiungi_messaggio("error", msg.contenuto)
-                    self._chat_view.aggiorna_stato("")
-
-                elif msg.tipo == TipoMessaggio.STATO:
-                    # Cambio stato
-                    if msg.completo:
-                        # Elaborazione terminata
-                        self._chat_view.finalizza_streaming()
-                        self._chat_view.aggiorna_stato("✅ Pronto")
-                        self._chat_view.abilita_input(True)
-                    else:
-                        self._chat_view.aggiorna_stato(f"⏳ {msg.contenuto}")
-
-                elif msg.tipo == TipoMessaggio.APPROVAZIONE:
-                    # Richiesta approvazione - mostra sia il dialogo popup
-                    # che la barra inline nella chat per doppia visibilità
-                    self._chat_view.mostra_approvazione(msg.contenuto)
-                    self._mostra_approvazione_codice(msg.contenuto, msg.linguaggio)
-
-                # Aggiorna token counter se presente
-                if msg.token_input > 0 or msg.token_output > 0:
-                    self._token_counter.aggiungi(msg.token_input, msg.token_output)
-                    self._status_bar.aggiorna_token(self._token_counter.formatta_breve())
+                gestore = gestori.get(msg.tipo)
+                if gestore:
+                    gestore(msg)
+
+                # Somma i token, il counter viene aggiornato una volta sola
+                token_input += msg.token_input
+                token_output += msg.token_output
 
             except Exception as e:
-                logger.error(f"❌ Errore processamento messaggio: {e}")
+                logger.error("❌ Errore processamento messaggio: %s", e)
+
+        try:
+            self._svuota_buffer_streaming()
+        except Exception as e:
+            logger.error("❌ Errore processamento messaggio: %s", e)
+
+        # Aggiorna token counter se presente
+        if token_input > 0 or token_output > 0:
+            self._token_counter.aggiungi(token_input, token_output)
+            self._fn_token(self._token_counter.formatta_breve())
+
+        # Uno STATO "in corso" conta solo se l'interprete sta ancora lavorando
+        # (dopo uno STOP non arriva mai lo STATO completo)
+        if self._in_streaming and not self._interpreter.is_in_esecuzione:
+            self._in_streaming = False
+
+        return n_messaggi, self._in_streaming
+
+    def _svuota_buffer_streaming(self) -> None:
+        """
+        Scarica nei widget il testo e l'output accumulati durante il tick.
+        
+        I pezzi consecutivi di TESTO e OUTPUT_CONSOLE vengono accumulati per
+        fare un solo aggiornamento dei widget invece di uno per messaggio.
+        Va chiamato prima di gestire qualsiasi altro tipo di messaggio,
+        così l'ordine di visualizzazione resta quello di arrivo.
+        """
+        if self._buffer_testo:
+            testo = "".join(self._buffer_testo)
+            self._buffer_testo.clear()
+            self._fn_streaming(testo)
+            self._chat_view.aggiorna_stato("🤖 Sta scrivendo...")
+
+        if self._buffer_output:
+            output = "".join(self._buffer_output)
+            self._buffer_output.clear()
+            self._fn_output(output)
+
+    # ==========================================
+    # Gestori dei singoli tipi di messaggio
+    # ==========================================
+
+    def _gestisci_testo(self, msg: MessaggioInterpreter) -> None:
+        """Testo dall'IA - accumula per lo streaming."""
+        self._buffer_testo.append(msg.contenuto)
+
+    def _gestisci_output(self, msg: MessaggioInterpreter) -> None:
+        """Output console - accumula per il terminale."""
+        self._buffer_output.append(msg.contenuto)
+
+    def _gestisci_codice(self, msg: MessaggioInterpreter) -> None:
+        """Codice - mostra nel terminale e nella chat."""
+        self._svuota_buffer_streaming()
+        self._fn_codice(msg.contenuto, msg.linguaggio)
+        # Intestazione passata a parte: niente copia del codice (anche molti KB)
+        # solo per preporre una riga
+        self._chat_view.aggiungi_messaggio(
+            "assistant",
+            msg.contenuto,
+            tipo="code",
+            intestazione=f"💻 Codice ({msg.linguaggio}):"
+        )
+
+    def _gestisci_errore(self, msg: MessaggioInterpreter) -> None:
+        """Errore - mostra sia nel terminale che nella chat."""
+        self._svuota_buffer_streaming()
+        self._fn_errore(msg.contenuto)
+        self._chat_view.aggiungi_messaggio("error", msg.contenuto)
+        self._chat_view.aggiorna_stato("")
+
+    def _gestisci_stato(self, msg: MessaggioInterpreter) -> None:
+        """Cambio stato (elaborazione in corso / terminata)."""
+        self._svuota_buffer_streaming()
+        self._in_streaming = not msg.completo
+        if msg.completo:
+            # Elaborazione terminata
+            self._chat_view.finalizza_streaming()
+            self._chat_view.aggiorna_stato("✅ Pronto")
+            self._chat_view.abilita_input(True)
+        else:
+            self._chat_view.aggiorna_stato(f"⏳ {msg.contenuto}")
+
+    def _gestisci_approvazione(self, msg: MessaggioInterpreter) -> None:
+        """
+        Richiesta approvazione - mostra sia il dialogo popup
+        che la barra inline nella chat per doppia visibilità.
+        """
+        self._svuota_buffer_streaming()
+        self._chat_view.mostra_approvazione(msg.contenuto)
+        self._mostra_approvazione_codice(msg.contenuto, msg.linguaggio)
 
     # ==========================================
     # Callback dalla GUI
@@ -390,7 +560,7 @@ class AppAutoBot(ctk.CTk):
         Args:
             messaggio: Il testo del messaggio
         """
-        logger.info(f"📤 Messaggio utente: {messaggio[:50]}...")
+        logger.info("📤 Messaggio utente: %.50s...", messaggio)
 
         # Disabilita l'input durante l'elaborazione
         self._chat_view.abilita_input(False)
@@ -421,7 +591,7 @@ class AppAutoBot(ctk.CTk):
         Args:
             provider: "locale" o "cloud"
         """
-        logger.info(f"🔄 Cambio provider a: {provider}")
+        logger.info("🔄 Cambio provider a: %s", provider)
 
         # Aggiorna le impostazioni
         self._impostazioni.provider_attivo = provider
@@ -472,7 +642,7 @@ class AppAutoBot(ctk.CTk):
         else:
             self._terminal_view.scrivi_stato("🖱️ Computer Use DISATTIVATO")
 
-        logger.info(f"🖱️ Computer Use: {'ATTIVO' if attivo else 'DISATTIVO'}")
+        logger.info("🖱️ Computer Use: %s", "ATTIVO" if attivo else "DISATTIVO")
         
         # Salva nelle impostazioni
         self._impostazioni.imposta("sicurezza.computer_use", attivo)
@@ -497,7 +667,7 @@ class AppAutoBot(ctk.CTk):
         else:
             self._terminal_view.scrivi_stato("👁️ Vision DISATTIVATA")
 
-        logger.info(f"👁️ Vision: {'ATTIVA' if attivo else 'DISATTIVATA'}")
+        logger.info("👁️ Vision: %s", "ATTIVA" if attivo else "DISATTIVATA")
         
         # Salva nelle impostazioni
         self._impostazioni.imposta("sicurezza.vision", attivo)
@@ -516,6 +686,8 @@ class AppAutoBot(ctk.CTk):
 
     def _on_nuova_chat(self) -> None:
         """Callback: l'utente vuole una nuova conversazione."""
+        from gui.dialogs import DialogoConferma
+
         DialogoConferma(
             self,
             titolo="Nuova Conversazione",
@@ -534,6 +706,9 @@ class AppAutoBot(ctk.CTk):
 
     def _on_export_cronologia(self) -> None:
         """Callback: l'utente vuole esportare la cronologia."""
+        from tkinter import filedialog
+        from utils.history_export import EsportaCronologia
+
         # Chiedi dove salvare
         percorso = filedialog.asksaveasfilename(
             title="Esporta Cronologia Chat",
@@ -548,16 +723,55 @@ class AppAutoBot(ctk.CTk):
         if not percorso:
             return
 
+        # Copia della cronologia presa qui, nel thread della GUI: il thread
+        # di export lavora su questa lista e non tocca lo stato condiviso
         cronologia = self._interpreter.cronologia
 
+        # La scrittura su disco avviene in un thread separato per non
+        # bloccare la GUI con cronologie molto lunghe
+        threading.Thread(
+            target=self._esegui_export,
+            args=(cronologia, percorso),
+            name="ExportThread",
+            daemon=True
+        ).start()
+        self._terminal_view.scrivi_log(f"Esportazione cronologia in corso: {percorso}")
+
+    def _esegui_export(self, cronologia: List[dict], percorso: str) -> None:
+        """
+        Scrive la cronologia su file (gira nel thread di export).
+        Al termine usa after() per notificare la GUI in modo thread-safe.
+        
+        Args:
+            cronologia: Copia dei messaggi da esportare
+            percorso: Percorso del file di destinazione
+        """
+        from utils.history_export import EsportaCronologia
+
         if percorso.endswith(".md"):
             successo = EsportaCronologia.esporta_md(cronologia, percorso)
         else:
             successo = EsportaCronologia.esporta_txt(cronologia, percorso)
 
+        try:
+            self.after(0, self._on_export_completato, percorso, successo)
+        except RuntimeError:
+            # La finestra è stata chiusa durante l'esportazione
+            pass
+
+    def _on_export_completato(self, percorso: str, successo: bool) -> None:
+        """
+        Mostra l'esito dell'esportazione (thread della GUI).
+        
+        Args:
+            percorso: Percorso del file esportato
+            successo: True se la scrittura è riuscita
+        """
         if successo:
             self._terminal_view.scrivi_stato(f"Cronologia esportata: {percorso}")
         else:
+            from gui.dialogs import DialogoErrore
+
             DialogoErrore(
                 self,
                 titolo="Errore Esportazione",
@@ -579,15 +793,29 @@ class AppAutoBot(ctk.CTk):
         if self._provider_manager.provider_attivo_tipo == "cloud":
             self._inizializza_interprete()
 
-    def _on_approva_codice(self) -> None:
-        """Callback: l'utente ha approvato l'esecuzione del codice."""
-        self._interpreter.approva_esecuzione(True)
-        self._terminal_view.scrivi_log("✅ Esecuzione codice approvata")
+    def _on_decisione_codice(self, approvato: bool) -> None:
+        """
+        Callback: l'utente ha approvato o rifiutato l'esecuzione del codice.
+        
+        Lo stesso callback è collegato sia alla barra inline della chat sia
+        al dialogo popup: la prima decisione vale, le successive (es. click
+        sulla barra dopo aver già risposto nel dialogo) vengono ignorate.
+        
+        Args:
+            approvato: True se l'utente ha approvato, False se ha rifiutato
+        """
+        # Qualunque sia la sorgente, la barra inline non serve più
+        self._chat_view.nascondi_approvazione()
+
+        if not self._interpreter.in_attesa_approvazione:
+            logger.debug("⚠️ Decisione codice ignorata: nessuna approvazione in attesa")
+            return
 
-    def _on_rifiuta_codice(self) -> None:
-        """Callback: l'utente ha rifiutato l'esecuzione del codice."""
-        self._interpreter.approva_esecuzione(False)
-        self._terminal_view.scrivi_log("❌ Esecuzione codice rifiutata")
+        self._interpreter.approva_esecuzione(approvato)
+        if approvato:
+            self._terminal_view.scrivi_log("✅ Esecuzione codice approvata")
+        else:
+            self._terminal_view.scrivi_log("❌ Esecuzione codice rifiutata")
 
     def _mostra_approvazione_codice(self, codice: str, linguaggio: str) -> None:
         """
@@ -597,12 +825,14 @@ class AppAutoBot(ctk.CTk):
             codice: Il codice da approvare
             linguaggio: Il linguaggio del codice
         """
+        from gui.dialogs import DialogoApprovazioneCodice
+
         DialogoApprovazioneCodice(
             self,
             codice=codice,
             linguaggio=linguaggio,
-            callback_approva=self._on_approva_codice,
-            callback_rifiuta=self._on_rifiuta_codice
+            callback_approva=self._callback_approva_codice,
+            callback_rifiuta=self._callback_rifiuta_codice
         )
 
     # ==========================================
@@ -615,14 +845,36 @@ class AppAutoBot(ctk.CTk):
         Viene chiamato dal thread di health check, quindi usiamo after()
         per aggiornare la GUI in modo thread-safe.
         
+        Gli aggiornamenti vengono ritardati di RITARDO_STATO_SERVER_MS:
+        se il server "rimbalza" (online -> offline -> online) in quel
+        intervallo, la GUI non viene ridisegnata inutilmente.
+        
         Args:
             online: True se il server è raggiungibile
         """
+        if online == self._stato_server_richiesto:
+            return
+        self._stato_server_richiesto = online
+
+        # Annulla un aggiornamento ancora in attesa (rimbalzo)
+        if self._after_stato_server is not None:
+            self.after_cancel(self._after_stato_server)
+            self._after_stato_server = None
+
+        # Tornati allo stato già mostrato: niente da ridisegnare
+        if online == self._stato_server_mostrato:
+            return
+
         # after() esegue la funzione nel thread principale della GUI
-        self.after(0, self._aggiorna_stato_server_gui, online)
+        self._after_stato_server = self.after(
+            RITARDO_STATO_SERVER_MS, self._aggiorna_stato_server_gui, online
+        )
 
     def _aggiorna_stato_server_gui(self, online: bool) -> None:
         """Aggiorna la GUI con lo stato del server (thread-safe)."""
+        self._after_stato_server = None
+        self._stato_server_mostrato = online
+
         self._sidebar.aggiorna_stato_server(online)
         self._status_bar.aggiorna_stato_server(online)
 
@@ -649,6 +901,9 @@ class AppAutoBot(ctk.CTk):
         # Ferma il health check
         self._health_check.ferma()
 
+        # Ferma il polling (e le sveglie) della coda messaggi
+        self._ferma_polling()
+
         # Salva le impostazioni
         self._impostazioni.salva()
 
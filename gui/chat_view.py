@@ -7,14 +7,75 @@
 import logging
 import tkinter as tk
 import customtkinter as ctk
-from typing import Callable, Optional
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
 from datetime import datetime
 
-from utils.markdown_renderer import configura_tag_markdown, inserisci_markdown
+from gui.fonts import ottieni_font
+from utils.markdown_renderer import configura_tag_markdown, inserisci_markdown, MarkdownStreamRenderer
 
 # Logger per questo modulo
 logger = logging.getLogger("AutoBotOx.GUI.ChatView")
 
+# Ultimo orario formattato: ((ora, minuto), "HH:MM")
+_ultimo_minuto = ((-1, -1), "")
+
+
+def _hhmm() -> str:
+    """
+    Restituisce l'ora attuale come "HH:MM".
+    
+    I messaggi vicini cadono quasi sempre nello stesso minuto, quindi
+    riformattiamo la stringa con strftime solo quando il minuto cambia.
+    """
+    global _ultimo_minuto
+    adesso = datetime.now()
+    chiave = (adesso.hour, adesso.minute)
+    if chiave != _ultimo_minuto[0]:
+        _ultimo_minuto = (chiave, adesso.strftime("%H:%M"))
+    return _ultimo_minuto[1]
+
+
+# Ogni quanti ms al massimo ridisegnare la bolla in streaming (~60 fps)
+INTERVALLO_FLUSH_STREAMING_MS = 16
+
+# Quante altezze di viewport tenere "vive" sopra e sotto la parte visibile.
+# Le bolle fuori da questa finestra vengono distrutte e sostituite da un
+# segnaposto vuoto della stessa altezza (virtualizzazione della lista)
+OVERSCAN_VIEWPORT = 1.0
+
+# Quante bolle inutilizzate tenere da parte (per ruolo) per riusarle
+# invece di distruggerle e ricostruirle
+MAX_BOLLE_POOL = 128
+
+# Attesa dopo l'ultimo ridimensionamento prima di ricalcolare le altezze
+RITARDO_REFLOW_MS = 100
+
+# Caratteri del codice mostrati nell'anteprima della barra di approvazione
+MAX_ANTEPRIMA_CODICE = 200
+
+# Quanti messaggi recenti ricordare per scartare i duplicati esatti
+MAX_MESSAGGI_RECENTI = 8
+
+# In un inserimento in blocco solo gli ultimi N messaggi diventano subito
+# bolle vere; i più vecchi restano segnaposto finché non si scorre fin lì
+MAX_BOLLE_BULK_VIVE = 20
+
+# Stima dell'altezza (in pixel) di una bolla mai disegnata
+ALTEZZA_HEADER_BOLLA = 50
+ALTEZZA_RIGA_BOLLA = 20
+CARATTERI_PER_RIGA_STIMATI = 80
+
+TESTO_BENVENUTO = (
+    "Benvenuto in AutoBot Ox! 🤖\n\n"
+    "Sono il tuo assistente AI. Posso:\n"
+    "• Eseguire comandi sul tuo PC\n"
+    "• Scrivere e modificare file\n"
+    "• Analizzare dati e creare grafici\n"
+    "• E molto altro!\n\n"
+    "Seleziona un provider LLM dalla sidebar e inizia a chattare."
+)
+
 
 class BollaMessaggio(ctk.CTkFrame):
     """
@@ -27,7 +88,26 @@ class BollaMessaggio(ctk.CTkFrame):
     - I messaggi di errore sono rossi
     """
 
-    def __init__(self, master, ruolo: str, contenuto: str, tipo: str = "message", **kwargs):
+    # Colori diversi per ogni tipo di messaggio
+    # (costanti di classe: non vanno modificate)
+    _COLORI = {
+        "user": {"bg": "#1a73e8", "fg": "white", "icona": "👤"},
+        "assistant": {"bg": "#2d2d2d", "fg": "#e0e0e0", "icona": "🤖"},
+        "error": {"bg": "#c62828", "fg": "white", "icona": "❌"},
+        "system": {"bg": "#1b5e20", "fg": "white", "icona": "ℹ️"},
+    }
+
+    # Nome mostrato nell'header per ogni ruolo
+    _NOMI = {
+        "user": "Tu",
+        "assistant": "AutoBot Ox",
+        "error": "Errore",
+        "system": "Sistema"
+    }
+
+    def __init__(self, master, ruolo: str, contenuto: str, tipo: str = "message",
+                 intestazione: str = "", ora: str = "", adatta_altezza: bool = True,
+                 **kwargs):
         """
         Crea una bolla di messaggio.
         
@@ -36,67 +116,48 @@ class BollaMessaggio(ctk.CTkFrame):
             ruolo: "user", "assistant" o "error"
             contenuto: Il testo del messaggio
             tipo: "message", "code", "console"
+            intestazione: Riga opzionale mostrata prima del contenuto
+                          (es. "💻 Codice (python):"), senza concatenarla al testo
+            ora: Orario da mostrare ("HH:MM"), se vuoto usa l'ora attuale
+            adatta_altezza: False per rimandare il calcolo dell'altezza
+                            (inserimenti in blocco, vedi aggiungi_messaggi_bulk)
         """
         super().__init__(master, **kwargs)
 
-        # Colori diversi per ogni tipo di messaggio
-        colori = {
-            "user": {"bg": "#1a73e8", "fg": "white", "icona": "👤"},
-            "assistant": {"bg": "#2d2d2d", "fg": "#e0e0e0", "icona": "🤖"},
-            "error": {"bg": "#c62828", "fg": "white", "icona": "❌"},
-            "system": {"bg": "#1b5e20", "fg": "white", "icona": "ℹ️"},
-        }
-
-        stile = colori.get(ruolo, colori["assistant"])
-
         self.configure(fg_color="transparent")
 
-        # Frame contenitore della bolla
-        bolla_frame = ctk.CTkFrame(
-            self,
-            fg_color=stile["bg"],
-            corner_radius=12
-        )
+        # Ruolo attualmente mostrato (None finché reset() non lo imposta)
+        self.ruolo: Optional[str] = None
+        self.tipo = tipo
 
-        # Allineamento: utente a destra, IA a sinistra
-        if ruolo == "user":
-            bolla_frame.pack(anchor="e", padx=(60, 10), pady=4, fill="x")
-        else:
-            bolla_frame.pack(anchor="w", padx=(10, 60), pady=4, fill="x")
+        # Stato del calcolo incrementale dell'altezza (vedi aggiungi_testo_streaming):
+        # righe visive prima dell'ultima riga logica e indice del suo inizio
+        self._righe_stabili = 0
+        self._inizio_ultima_riga: Optional[str] = None
 
-        # Header con icona e timestamp
-        header = ctk.CTkFrame(bolla_frame, fg_color="transparent")
-        header.pack(fill="x", padx=10, pady=(8, 2))
+        # Renderer markdown incrementale dello streaming (creato al primo pezzo)
+        self._renderer_streaming: Optional[MarkdownStreamRenderer] = None
 
-        nome_ruolo = {
-            "user": "Tu",
-            "assistant": "AutoBot Ox",
-            "error": "Errore",
-            "system": "Sistema"
-        }
+        # Frame contenitore della bolla (colore e allineamento in reset())
+        self._bolla_frame = ctk.CTkFrame(self, corner_radius=12)
 
-        ctk.CTkLabel(
-            header,
-            text=f"{stile['icona']} {nome_ruolo.get(ruolo, ruolo)}",
-            font=ctk.CTkFont(size=12, weight="bold"),
-            text_color=stile["fg"]
-        ).pack(side="left")
-
-        ctk.CTkLabel(
-            header,
-            text=datetime.now().strftime("%H:%M"),
-            font=ctk.CTkFont(size=10),
-            text_color="gray60"
-        ).pack(side="right")
+        # Header: icona, nome e orario composti in un'unica etichetta
+        # (un solo widget al posto di frame + due label per ogni bolla)
+        self._label_header = ctk.CTkLabel(
+            self._bolla_frame,
+            text="",
+            font=ottieni_font(12, "bold"),
+            anchor="w"
+        )
+        self._label_header.pack(fill="x", padx=10, pady=(8, 2))
+        self._testo_ruolo = ""
 
         # Contenuto del messaggio con rendering markdown
         # Usiamo tkinter.Text per supportare grassetto, corsivo, headers, ecc.
         # CTkLabel non supporta rich text, quindi usiamo il Text nativo.
         self.text_contenuto = tk.Text(
-            bolla_frame,
+            self._bolla_frame,
             font=("Segoe UI", 13),
-            fg=stile["fg"],
-            bg=stile["bg"],
             wrap="word",
             relief="flat",
             borderwidth=0,
@@ -108,23 +169,70 @@ class BollaMessaggio(ctk.CTkFrame):
             height=1                   # Altezza minima, si adatta al contenuto
         )
         self.text_contenuto.pack(fill="x", padx=2, pady=(2, 8))
+
+        # Colori, testi e contenuto markdown
+        self.reset(ruolo, contenuto, tipo, intestazione, ora, adatta_altezza)
+
+    def reset(self, ruolo: str, contenuto: str, tipo: str = "message",
+              intestazione: str = "", ora: str = "", adatta_altezza: bool = True) -> None:
+        """
+        Riconfigura la bolla per mostrare un altro messaggio.
         
-        # Configura i tag markdown sul widget
-        configura_tag_markdown(self.text_contenuto, colore_testo=stile["fg"])
+        Permette di riusare una bolla già costruita (pool di ChatView)
+        invece di distruggerla e crearne una nuova: i widget restano gli
+        stessi, cambiano solo colori e testi.
         
+        Args:
+            ruolo: "user", "assistant", "error" o "system"
+            contenuto: Il testo del messaggio
+            tipo: "message", "code", "console"
+            intestazione: Riga opzionale mostrata prima del contenuto
+            ora: Orario da mostrare ("HH:MM"), se vuoto usa l'ora attuale
+            adatta_altezza: False per rimandare il calcolo dell'altezza
+        """
+        if ruolo != self.ruolo:
+            stile = self._COLORI.get(ruolo, self._COLORI["assistant"])
+
+            self._bolla_frame.configure(fg_color=stile["bg"])
+
+            # Allineamento: utente a destra, IA a sinistra
+            self._bolla_frame.pack_forget()
+            if ruolo == "user":
+                self._bolla_frame.pack(anchor="e", padx=(60, 10), pady=4, fill="x")
+            else:
+                self._bolla_frame.pack(anchor="w", padx=(10, 60), pady=4, fill="x")
+
+            self._testo_ruolo = f"{stile['icona']} {self._NOMI.get(ruolo, ruolo)}"
+            self._label_header.configure(text_color=stile["fg"])
+            self.text_contenuto.configure(fg=stile["fg"], bg=stile["bg"])
+
+            # Configura i tag markdown sul widget
+            configura_tag_markdown(self.text_contenuto, colore_testo=stile["fg"])
+            self.ruolo = ruolo
+
+        self.tipo = tipo
+        self._label_header.configure(text=f"{self._testo_ruolo}  ·  {ora or _hhmm()}")
+
         # Inserisci il contenuto con formattazione markdown
-        self._imposta_testo(contenuto)
+        self._imposta_testo(contenuto, intestazione, adatta_altezza)
     
-    def _imposta_testo(self, testo: str) -> None:
+    def _imposta_testo(self, testo: str, intestazione: str = "",
+                       adatta_altezza: bool = True) -> None:
         """
         Imposta il testo del messaggio con formattazione markdown.
         Gestisce anche l'auto-ridimensionamento dell'altezza del widget.
         
         Args:
             testo: Il testo markdown da mostrare
+            intestazione: Riga opzionale da mostrare prima del testo
+            adatta_altezza: False per non ricalcolare subito l'altezza
         """
+        self._inizio_ultima_riga = None
+        self._renderer_streaming = None
         self.text_contenuto.configure(state="normal")
         self.text_contenuto.delete("1.0", "end")
+        if intestazione:
+            self.text_contenuto.insert("end", intestazione + "\n", "normale")
         inserisci_markdown(self.text_contenuto, testo)
         
         # Rimuovi l'ultimo \n in eccesso se presente
@@ -135,9 +243,10 @@ class BollaMessaggio(ctk.CTkFrame):
         self.text_contenuto.configure(state="disabled")
         
         # Auto-ridimensiona l'altezza in base al contenuto
-        self._adatta_altezza()
+        if adatta_altezza:
+            self._adatta_altezza()
     
-    def _adatta_altezza(self) -> None:
+    def _adatta_altezza(self, aggiorna_layout: bool = True) -> None:
         """
         Adatta l'altezza del widget Text al contenuto.
         tkinter.Text non lo fa automaticamente, quindi calcoliamo
@@ -146,8 +255,16 @@ class BollaMessaggio(ctk.CTkFrame):
         NOTA: Usiamo count con "displaylines" per contare le righe
         VISIVE (incluso word-wrap), non quelle logiche. Così testi
         lunghi che vanno a capo non vengono tagliati.
+        
+        Args:
+            aggiorna_layout: False se il layout è già stato aggiornato
+                             (evita un update_idletasks per ogni bolla)
         """
-        self.text_contenuto.update_idletasks()
+        if aggiorna_layout:
+            self.text_contenuto.update_idletasks()
+
+        # Il conteggio incrementale va rifatto da capo (es. dopo un reflow)
+        self._inizio_ultima_riga = None
         
         try:
             # Conta le display lines (righe visive, incluso word-wrap)
@@ -171,6 +288,60 @@ class BollaMessaggio(ctk.CTkFrame):
         
         self.text_contenuto.configure(height=max(1, num_righe))
 
+    def aggiungi_testo_streaming(self, testo: str) -> None:
+        """
+        Appende un pezzo di testo markdown in fondo alla bolla.
+        Usato durante lo streaming.
+
+        Le righe complete vengono formattate subito da un
+        MarkdownStreamRenderer, una volta sola ciascuna; l'ultima riga,
+        ancora incompleta, è mostrata come testo semplice finché non arriva
+        il suo "\n".
+        
+        OTTIMIZZAZIONE PERFORMANCE:
+        _adatta_altezza() conta le righe visive di TUTTO il testo: con una
+        risposta lunga in streaming sarebbe un lavoro O(lunghezza) ad ogni
+        pezzo. Appendendo in fondo, però, le righe logiche già complete non
+        cambiano più il loro a capo: basta contare una volta le righe nuove
+        e ricontare solo l'ultima riga (quella che si sta allungando).
+        
+        Args:
+            testo: Il testo da appendere
+        """
+        widget = self.text_contenuto
+        if self._renderer_streaming is None:
+            self._renderer_streaming = MarkdownStreamRenderer(widget, mostra_parziale=True)
+        widget.configure(state="normal")
+        self._renderer_streaming.aggiungi(testo)
+        widget.configure(state="disabled")
+
+        widget.update_idletasks()
+        if self._inizio_ultima_riga is None:
+            self._righe_stabili = 0
+            self._inizio_ultima_riga = "1.0"
+
+        inizio_ultima = widget.index("end-1c linestart")
+        self._righe_stabili += self._conta_righe_visive(self._inizio_ultima_riga, inizio_ultima)
+        self._inizio_ultima_riga = inizio_ultima
+
+        num_righe = self._righe_stabili + self._conta_righe_visive(inizio_ultima, "end")
+        widget.configure(height=max(1, num_righe))
+
+    def _conta_righe_visive(self, inizio: str, fine: str) -> int:
+        """
+        Conta le righe visive (incluso word-wrap) tra due indici del Text.
+        
+        Returns:
+            Il numero di righe, 0 se l'intervallo è vuoto
+        """
+        try:
+            risultato = self.text_contenuto.count(inizio, fine, "displaylines")
+        except Exception:
+            return 0
+        if isinstance(risultato, tuple):
+            return risultato[0]
+        return int(risultato) if risultato else 0
+
 
 class ChatView(ctk.CTkFrame):
     """
@@ -216,10 +387,60 @@ class ChatView(ctk.CTkFrame):
         # Costruisci l'interfaccia
         self._costruisci_ui()
 
-        # Testo corrente dell'assistente (per lo streaming)
-        self._testo_streaming = ""
+        # Testo corrente dell'assistente (per lo streaming), tenuto a pezzi:
+        # "testo += pezzo" su un attributo ricopia ogni volta tutta la
+        # stringa (costo quadratico), la lista viene unita una volta sola
+        self._pezzi_streaming: List[str] = []
         self._label_streaming = None
 
+        # Messaggi della chat (virtualizzati): ogni elemento è un dizionario
+        # con i dati del messaggio, lo "slot" (tk.Frame leggero che tiene il
+        # posto nella lista) e la bolla, presente solo se vicina alla vista
+        self._messaggi: List[Dict] = []
+        self._indici_vivi: Set[int] = set()
+        self._record_streaming: Optional[Dict] = None
+        self._riconciliazione_pendente = False
+
+        # Ultimi messaggi di testo (ruolo, tipo, hash) non dell'utente dall'ultimo
+        # turno o esecuzione: i provider a volte ripetono la risposta finale e
+        # gli errori si ripetono, ogni copia costerebbe una bolla intera
+        self._recenti: Deque[Tuple[str, str, int]] = deque(maxlen=MAX_MESSAGGI_RECENTI)
+
+        # True durante aggiungi_messaggi_bulk: le altezze vengono calcolate
+        # tutte insieme alla fine, con un solo passaggio di layout
+        self._batch_mode = False
+
+        # Pool di bolle già costruite ma non in uso, divise per ruolo:
+        # riconfigurare una bolla costa molto meno che crearne una nuova
+        self._pool_bolle: Dict[str, List[BollaMessaggio]] = {
+            "user": [], "assistant": [], "error": [], "system": []
+        }
+
+        # Larghezza dell'area messaggi e reflow pianificato (vedi _on_resize)
+        self._larghezza_attuale = 0
+        self._after_reflow = None
+
+        # Messaggio di benvenuto
+        self._aggiungi_messaggio_benvenuto()
+
+        # Pezzi di streaming arrivati ma non ancora scritti nel widget:
+        # vengono scritti tutti insieme al prossimo flush (uno per frame)
+        self._streaming_in_attesa: list = []
+        self._streaming_dirty = False
+        self._streaming_after_id = None
+
+        # True se un flush è stato saltato perché la chat non era visibile
+        # (finestra minimizzata): i pezzi restano in attesa fino al ritorno
+        self._pending_streaming = False
+
+        # Scroll in fondo già pianificato per il prossimo giro di idle
+        self._scroll_pending = False
+        # True se uno scroll è stato saltato perché la chat non era visibile:
+        # viene rifatto quando la finestra torna visibile
+        self._scroll_dopo_ritorno = False
+        self.winfo_toplevel().bind("<Map>", self._on_ritorno_visibile, add="+")
+        self.bind("<Visibility>", self._on_ritorno_visibile, add="+")
+
         logger.info("💬 ChatView costruita")
 
     def _costruisci_ui(self) -> None:
@@ -233,28 +454,23 @@ class ChatView(ctk.CTkFrame):
         ctk.CTkLabel(
             header,
             text="💬 Chat",
-            font=ctk.CTkFont(size=16, weight="bold")
+            font=ottieni_font(16, "bold")
         ).pack(side="left", padx=15, pady=5)
 
         # Indicatore "sta scrivendo..."
+        # Legato a una StringVar: durante lo streaming viene aggiornato
+        # spesso e .set() evita il giro completo di CTkLabel.configure()
+        self._var_stato = ctk.StringVar(value="")
         self._label_stato = ctk.CTkLabel(
             header,
-            text="",
-            font=ctk.CTkFont(size=11),
+            textvariable=self._var_stato,
+            font=ottieni_font(11),
             text_color="gray50"
         )
         self._label_stato.pack(side="right", padx=15, pady=5)
 
         # ========== AREA MESSAGGI (SCROLLABILE) ==========
-        self._scroll_frame = ctk.CTkScrollableFrame(
-            self,
-            fg_color=("gray95", "gray10"),
-            corner_radius=0
-        )
-        self._scroll_frame.pack(fill="both", expand=True, padx=0, pady=0)
-
-        # Messaggio di benvenuto
-        self._aggiungi_messaggio_benvenuto()
+        self._crea_area_messaggi()
 
         # ========== FRAME APPROVAZIONE (nascosto di default) ==========
         self._frame_approvazione = ctk.CTkFrame(
@@ -267,9 +483,23 @@ class ChatView(ctk.CTkFrame):
         ctk.CTkLabel(
             self._frame_approvazione,
             text="⚠️ L'IA vuole eseguire del codice. Approvare?",
-            font=ctk.CTkFont(size=13)
+            font=ottieni_font(13)
         ).pack(side="left", padx=15)
 
+        # Anteprima del codice: costruita una volta sola, ad ogni richiesta
+        # cambia solo il valore della StringVar (nessun widget ricreato)
+        self._codice_var = ctk.StringVar(value="")
+        self._lbl_codice_preview = ctk.CTkLabel(
+            self._frame_approvazione,
+            textvariable=self._codice_var,
+            font=ottieni_font(11, family="Consolas"),
+            text_color="gray60",
+            justify="left",
+            anchor="w",
+            wraplength=400
+        )
+        self._lbl_codice_preview.pack(side="left", fill="x", expand=True, padx=5)
+
         self._btn_approva = ctk.CTkButton(
             self._frame_approvazione,
             text="✅ Approva",
@@ -278,7 +508,7 @@ class ChatView(ctk.CTkFrame):
             fg_color="#2e7d32",
             hover_color="#1b5e20",
             command=self._on_approva,
-            font=ctk.CTkFont(size=12)
+            font=ottieni_font(12)
         )
         self._btn_approva.pack(side="right", padx=5, pady=8)
 
@@ -290,7 +520,7 @@ class ChatView(ctk.CTkFrame):
             fg_color="#c62828",
             hover_color="#b71c1c",
             command=self._on_rifiuta,
-            font=ctk.CTkFont(size=12)
+            font=ottieni_font(12)
         )
         self._btn_rifiuta.pack(side="right", padx=5, pady=8)
 
@@ -302,7 +532,7 @@ class ChatView(ctk.CTkFrame):
         self._entry_messaggio = ctk.CTkEntry(
             input_frame,
             placeholder_text="Scrivi un messaggio... (Invio per inviare)",
-            font=ctk.CTkFont(size=14),
+            font=ottieni_font(14),
             height=40
         )
         self._entry_messaggio.pack(side="left", fill="x", expand=True, padx=(10, 5), pady=10)
@@ -319,7 +549,7 @@ class ChatView(ctk.CTkFrame):
             fg_color="#c62828",
             hover_color="#b71c1c",
             command=self._on_stop,
-            font=ctk.CTkFont(size=18)
+            font=ottieni_font(18)
         )
         self._btn_stop.pack(side="right", padx=(0, 10), pady=10)
 
@@ -330,25 +560,238 @@ class ChatView(ctk.CTkFrame):
             width=80,
             height=40,
             command=self._on_invia,
-            font=ctk.CTkFont(size=13, weight="bold")
+            font=ottieni_font(13, "bold")
         )
         self._btn_invia.pack(side="right", padx=5, pady=10)
 
+    def _crea_area_messaggi(self, **opzioni_pack) -> None:
+        """
+        Crea il frame scrollabile che contiene i messaggi.
+
+        Usato alla costruzione e da pulisci_chat(), che invece di distruggere
+        i messaggi uno per uno sostituisce l'intero frame con uno nuovo.
+
+        Args:
+            opzioni_pack: Opzioni aggiuntive per pack() (es. before=...)
+        """
+        self._scroll_frame = ctk.CTkScrollableFrame(
+            self,
+            fg_color=("gray95", "gray10"),
+            corner_radius=0
+        )
+        self._scroll_frame.pack(fill="both", expand=True, padx=0, pady=0, **opzioni_pack)
+
+        # Ogni volta che la vista scorre o cambia dimensione il canvas chiama
+        # yscrollcommand: lo intercettiamo per riconciliare le bolle vive
+        canvas = self._scroll_frame._parent_canvas
+        self._scrollbar_set = self._scroll_frame._scrollbar.set
+        canvas.configure(yscrollcommand=self._on_scroll_canvas)
+
+        # Quando cambia la larghezza il testo va a capo in punti diversi e
+        # le altezze delle bolle vanno ricalcolate: lo facciamo una volta
+        # sola a ridimensionamento finito, non ad ogni pixel di trascinamento
+        canvas.bind("<Configure>", self._on_resize, add="+")
+
     def _aggiungi_messaggio_benvenuto(self) -> None:
         """Aggiunge un messaggio di benvenuto alla chat."""
-        BollaMessaggio(
+        self._nuovo_messaggio("system", TESTO_BENVENUTO)
+
+    # ==========================================
+    # Virtualizzazione della lista messaggi
+    # ==========================================
+
+    def _nuovo_messaggio(self, ruolo: str, contenuto: str, tipo: str = "message",
+                         intestazione: str = "", ora: str = "",
+                         materializza: bool = True) -> Dict:
+        """
+        Registra un messaggio in fondo alla lista e ne crea subito la bolla.
+        
+        Con materializza=False la bolla non viene creata: lo slot resta un
+        segnaposto con un'altezza stimata e la bolla verrà costruita dalla
+        virtualizzazione solo se l'utente scorre fino a quel messaggio.
+        
+        Args:
+            ruolo: "user", "assistant", "error" o "system"
+            contenuto: Il testo del messaggio
+            tipo: "message", "code" o "console"
+            intestazione: Riga opzionale mostrata prima del contenuto
+            ora: Orario del messaggio ("HH:MM"), se vuoto usa l'ora attuale
+            materializza: False per creare solo il segnaposto
+            
+        Returns:
+            Il record del messaggio appena aggiunto
+        """
+        # Lo slot è un tk.Frame nativo (nessun canvas CTk): costa pochissimo
+        # e resta nella lista anche quando la bolla viene distrutta
+        slot = tk.Frame(
             self._scroll_frame,
-            ruolo="system",
-            contenuto=(
-                "Benvenuto in AutoBot Ox! 🤖\n\n"
-                "Sono il tuo assistente AI. Posso:\n"
-                "• Eseguire comandi sul tuo PC\n"
-                "• Scrivere e modificare file\n"
-                "• Analizzare dati e creare grafici\n"
-                "• E molto altro!\n\n"
-                "Seleziona un provider LLM dalla sidebar e inizia a chattare."
-            )
-        ).pack(fill="x", padx=5, pady=2)
+            bg=tk.Frame.cget(self._scroll_frame, "bg"),
+            borderwidth=0,
+            highlightthickness=0
+        )
+        slot.pack(fill="x", padx=5, pady=2)
+
+        record = {
+            "ruolo": ruolo,
+            "contenuto": contenuto,
+            "tipo": tipo,
+            "intestazione": intestazione,
+            "ora": ora or _hhmm(),
+            "slot": slot,
+            "widget": None,
+        }
+        self._messaggi.append(record)
+        if materializza:
+            self._materializza(len(self._messaggi) - 1)
+        else:
+            slot.configure(height=self._stima_altezza(contenuto))
+            slot.pack_propagate(False)
+        return record
+
+    @staticmethod
+    def _stima_altezza(contenuto: str) -> int:
+        """Stima grossolana dell'altezza in pixel di una bolla mai disegnata."""
+        righe = contenuto.count("\n") + 1 + len(contenuto) // CARATTERI_PER_RIGA_STIMATI
+        return ALTEZZA_HEADER_BOLLA + righe * ALTEZZA_RIGA_BOLLA
+
+    def _materializza(self, indice: int) -> None:
+        """Crea la bolla del messaggio all'indice dato, se non esiste già."""
+        record = self._messaggi[indice]
+        if record["widget"] is None:
+            slot = record["slot"]
+            slot.pack_propagate(True)  # Lo slot torna ad adattarsi alla bolla
+
+            pool = self._pool_bolle.get(record["ruolo"])
+            if pool:
+                bolla = pool.pop()
+                bolla.reset(
+                    record["ruolo"],
+                    record["contenuto"],
+                    tipo=record["tipo"],
+                    intestazione=record["intestazione"],
+                    ora=record["ora"],
+                    adatta_altezza=not self._batch_mode
+                )
+            else:
+                # Le bolle sono figlie dell'area scrollabile (non dello slot)
+                # così possono passare da uno slot all'altro con pack(in_=...)
+                bolla = BollaMessaggio(
+                    self._scroll_frame,
+                    ruolo=record["ruolo"],
+                    contenuto=record["contenuto"],
+                    tipo=record["tipo"],
+                    intestazione=record["intestazione"],
+                    ora=record["ora"],
+                    adatta_altezza=not self._batch_mode
+                )
+            bolla.pack(in_=slot, fill="x")
+            # Una bolla riciclata può essere più "vecchia" dello slot:
+            # va portata sopra, altrimenti lo slot la coprirebbe
+            bolla.lift(slot)
+            record["widget"] = bolla
+        self._indici_vivi.add(indice)
+
+    def _rilascia(self, indice: int) -> None:
+        """
+        Distrugge la bolla del messaggio all'indice dato, lasciando al suo
+        posto lo slot vuoto con la stessa altezza (lo scroll non salta).
+        """
+        record = self._messaggi[indice]
+        bolla = record["widget"]
+        if bolla is None or record is self._record_streaming:
+            self._indici_vivi.discard(indice)
+            return
+
+        slot = record["slot"]
+        altezza = slot.winfo_height()
+        if altezza <= 1:
+            # Non ancora disegnata: non conosciamo l'altezza, la teniamo
+            return
+
+        slot.configure(height=altezza)
+        slot.pack_propagate(False)  # Lo slot mantiene l'altezza anche vuoto
+        self._ricicla_bolla(bolla)
+        record["widget"] = None
+        self._indici_vivi.discard(indice)
+
+    def _ricicla_bolla(self, bolla: BollaMessaggio) -> None:
+        """Toglie la bolla dalla vista e la mette nel pool (o la distrugge se pieno)."""
+        bolla.pack_forget()
+        pool = self._pool_bolle.setdefault(bolla.ruolo, [])
+        if len(pool) < MAX_BOLLE_POOL:
+            pool.append(bolla)
+        else:
+            bolla.destroy()
+
+    def _on_scroll_canvas(self, primo: str, ultimo: str) -> None:
+        """
+        yscrollcommand del canvas: aggiorna la scrollbar e pianifica
+        (una volta sola per giro di idle) la riconciliazione delle bolle.
+        """
+        self._scrollbar_set(primo, ultimo)
+        if not self._riconciliazione_pendente:
+            self._riconciliazione_pendente = True
+            self.after_idle(self._riconcilia_viewport)
+
+    def _on_resize(self, event) -> None:
+        """Il canvas ha cambiato dimensione: pianifica il reflow (debounce)."""
+        if event.width == self._larghezza_attuale:
+            return
+        self._larghezza_attuale = event.width
+
+        if self._after_reflow is not None:
+            self.after_cancel(self._after_reflow)
+        self._after_reflow = self.after(RITARDO_REFLOW_MS, self._reflow_bolle)
+
+    def _reflow_bolle(self) -> None:
+        """Ricalcola l'altezza delle sole bolle vive dopo un cambio di larghezza."""
+        self._after_reflow = None
+        self._scroll_frame.update_idletasks()
+        for indice in self._indici_vivi:
+            bolla = self._messaggi[indice]["widget"]
+            if bolla is not None:
+                bolla._adatta_altezza(aggiorna_layout=False)
+
+    def _cerca_indice(self, y: float) -> int:
+        """
+        Ricerca binaria del primo messaggio il cui bordo inferiore è >= y.
+        Gli slot sono impilati in ordine, quindi le loro y sono crescenti.
+        """
+        messaggi = self._messaggi
+        basso, alto = 0, len(messaggi)
+        while basso < alto:
+            medio = (basso + alto) // 2
+            slot = messaggi[medio]["slot"]
+            if slot.winfo_y() + slot.winfo_height() < y:
+                basso = medio + 1
+            else:
+                alto = medio
+        return basso
+
+    def _riconcilia_viewport(self) -> None:
+        """
+        Tiene vive solo le bolle nella parte visibile della chat (più
+        OVERSCAN_VIEWPORT schermate sopra e sotto) e rilascia le altre.
+        """
+        self._riconciliazione_pendente = False
+        n = len(self._messaggi)
+        altezza_totale = self._scroll_frame.winfo_height()
+        if not n or altezza_totale <= 1:
+            return
+
+        inizio, fine = self._scroll_frame._parent_canvas.yview()
+        y_inizio = inizio * altezza_totale
+        y_fine = fine * altezza_totale
+        margine = (y_fine - y_inizio) * OVERSCAN_VIEWPORT
+
+        primo = self._cerca_indice(y_inizio - margine)
+        ultimo = min(self._cerca_indice(y_fine + margine), n - 1)
+
+        for indice in list(self._indici_vivi):
+            if indice < primo or indice > ultimo:
+                self._rilascia(indice)
+        for indice in range(primo, ultimo + 1):
+            self._materializza(indice)
 
     # ==========================================
     # Event Handler
@@ -374,7 +817,9 @@ class ChatView(ctk.CTkFrame):
         if self._callback_invia:
             self._callback_invia(messaggio)
 
-        logger.debug(f"📤 Messaggio inviato: {messaggio[:50]}...")
+        # Argomenti %-style: la stringa viene formattata solo se il DEBUG è attivo
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📤 Messaggio inviato: %.50s...", messaggio)
 
     def _on_stop(self) -> None:
         """Gestisce la pressione del pulsante STOP."""
@@ -398,7 +843,8 @@ class ChatView(ctk.CTkFrame):
     # Metodi pubblici
     # ==========================================
 
-    def aggiungi_messaggio(self, ruolo: str, contenuto: str, tipo: str = "message") -> None:
+    def aggiungi_messaggio(self, ruolo: str, contenuto: str, tipo: str = "message",
+                           intestazione: str = "") -> None:
         """
         Aggiunge un messaggio alla chat.
         
@@ -406,58 +852,163 @@ class ChatView(ctk.CTkFrame):
             ruolo: "user", "assistant", "error" o "system"
             contenuto: Il testo del messaggio
             tipo: "message", "code" o "console"
+            intestazione: Riga opzionale mostrata prima del contenuto
         """
-        if not contenuto.strip():
+        # isspace() evita la copia della stringa che farebbe strip()
+        if not contenuto or contenuto.isspace():
             return
 
-        bolla = BollaMessaggio(
-            self._scroll_frame,
-            ruolo=ruolo,
-            contenuto=contenuto,
-            tipo=tipo
-        )
-        bolla.pack(fill="x", padx=5, pady=2)
+        if ruolo == "user" or tipo != "message":
+            # Nuovo turno o nuova esecuzione (codice/output): un messaggio
+            # uguale a uno precedente è legittimo. Il codice non viene mai
+            # scartato: rieseguire lo stesso codice è un'esecuzione distinta
+            self._recenti.clear()
+        else:
+            chiave = (ruolo, tipo, hash((intestazione, contenuto)))
+            if chiave in self._recenti:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("💬 Messaggio duplicato ignorato (%s)", ruolo)
+                return
+            self._recenti.append(chiave)
+
+        self._nuovo_messaggio(ruolo, contenuto, tipo, intestazione)
 
         # Scrolla in basso automaticamente
         self._scroll_in_basso()
 
+    def aggiungi_messaggi_bulk(self, messaggi: List[Dict]) -> None:
+        """
+        Aggiunge molti messaggi in una volta (es. ripristino cronologia).
+        
+        Aggiungerli uno alla volta con aggiungi_messaggio() costa un
+        passaggio di layout per ogni bolla; qui le bolle vengono create
+        tutte, poi il layout viene aggiornato una volta sola e solo allora
+        si calcolano le altezze e si scrolla in fondo.
+        
+        Solo gli ultimi MAX_BOLLE_BULK_VIVE messaggi diventano subito bolle:
+        gli altri (la cronologia vecchia, fuori vista) restano segnaposto.
+        
+        Args:
+            messaggi: Lista di dizionari con le chiavi "ruolo" e "contenuto"
+                      (opzionali: "tipo", "intestazione", "ora")
+        """
+        # Stesso orario per tutto il blocco (se il messaggio non ha il suo)
+        ora_corrente = _hhmm()
+        validi = [
+            dati for dati in messaggi
+            if dati.get("contenuto") and not dati["contenuto"].isspace()
+        ]
+        primo_vivo = len(validi) - MAX_BOLLE_BULK_VIVE
+        nuovi = []
+
+        self._batch_mode = True
+        try:
+            for indice, dati in enumerate(validi):
+                nuovi.append(self._nuovo_messaggio(
+                    dati.get("ruolo", "assistant"),
+                    dati["contenuto"],
+                    dati.get("tipo", "message"),
+                    dati.get("intestazione", ""),
+                    dati.get("ora") or ora_corrente,
+                    materializza=indice >= primo_vivo
+                ))
+        finally:
+            self._batch_mode = False
+
+        if not nuovi:
+            return
+
+        # Un solo passaggio di layout per tutto il blocco
+        self._scroll_frame.update_idletasks()
+        for record in nuovi:
+            if record["widget"] is not None:
+                record["widget"]._adatta_altezza(aggiorna_layout=False)
+
+        self._scroll_in_basso()
+        logger.debug("💬 %d messaggi aggiunti in blocco", len(nuovi))
+
     def aggiungi_testo_streaming(self, testo: str) -> None:
         """
         Aggiunge testo in streaming (pezzo per pezzo) all'ultimo messaggio.
         Usato per mostrare la risposta dell'IA in tempo reale.
         
         OTTIMIZZAZIONE PERFORMANCE:
-        Durante lo streaming, appendiamo testo RAW al widget Text senza
-        ri-parsare tutto il markdown ogni volta (troppo costoso con molti token).
-        Il rendering markdown completo viene fatto in finalizza_streaming().
+        Durante lo streaming ogni riga viene formattata una volta sola, appena
+        completa, senza ri-parsare tutto il markdown ogni volta (troppo
+        costoso con molti token). Il rendering markdown completo viene
+        rifatto una volta in finalizza_streaming().
+        
+        Inoltre i pezzi non vengono scritti subito: si accumulano e un solo
+        flush ogni INTERVALLO_FLUSH_STREAMING_MS li scrive tutti insieme,
+        con un solo ricalcolo di altezza e scroll per frame invece di uno
+        per token.
         
         Args:
             testo: Il nuovo pezzo di testo da aggiungere
         """
-        self._testo_streaming += testo
+        self._pezzi_streaming.append(testo)
+        self._streaming_in_attesa.append(testo)
+
+        # Chat nascosta: i pezzi restano in attesa fino al ritorno,
+        # senza pianificare un flush per ogni token
+        if self._pending_streaming:
+            return
+
+        if not self._streaming_dirty:
+            self._streaming_dirty = True
+            self._streaming_after_id = self.after(
+                INTERVALLO_FLUSH_STREAMING_MS, self._flush_streaming
+            )
+
+    def _flush_streaming(self) -> None:
+        """
+        Scrive nella bolla di streaming tutti i pezzi accumulati dall'ultimo
+        flush, poi adatta l'altezza e scrolla una volta sola.
+        """
+        self._streaming_dirty = False
+        self._streaming_after_id = None
+
+        if not self._streaming_in_attesa:
+            return
+
+        # Finestra nascosta: inutile far lavorare Tk su widget non visibili,
+        # il testo verrà scritto tutto insieme quando torna visibile
+        if not self._scroll_frame.winfo_viewable():
+            self._pending_streaming = True
+            return
+
+        testo = "".join(self._streaming_in_attesa)
+        self._streaming_in_attesa.clear()
 
         # Se non esiste ancora una bolla per lo streaming, creala
         if self._label_streaming is None:
-            self._label_streaming = BollaMessaggio(
-                self._scroll_frame,
-                ruolo="assistant",
-                contenuto=""  # Vuoto, appendiamo dopo
-            )
-            self._label_streaming.pack(fill="x", padx=5, pady=2)
+            self._crea_bolla_streaming()
 
-        # Appendi il nuovo testo RAW (senza ri-parsare tutto il markdown)
+        # Appendi il nuovo testo (senza ri-parsare tutto il markdown)
         # Questo è molto più veloce perché non rifa il clear+parse completo
-        widget = self._label_streaming.text_contenuto
-        widget.configure(state="normal")
-        widget.insert("end", testo, "normale")
-        widget.configure(state="disabled")
+        self._label_streaming.aggiungi_testo_streaming(testo)
+        self._scroll_in_basso()
 
-        # Aggiorna l'altezza periodicamente per adattarla al contenuto
-        if len(self._testo_streaming) % 50 == 0 or len(testo) > 5:
-            self._label_streaming._adatta_altezza()
+    def _annulla_flush_streaming(self) -> None:
+        """Annulla il flush in attesa e scarta i pezzi non ancora scritti."""
+        if self._streaming_after_id is not None:
+            self.after_cancel(self._streaming_after_id)
+            self._streaming_after_id = None
+        self._streaming_dirty = False
+        self._pending_streaming = False
+        self._streaming_in_attesa.clear()
 
-        # Scrolla solo ogni N caratteri per evitare overhead
-        if len(self._testo_streaming) % 30 == 0 or len(testo) > 5:
+    def _on_ritorno_visibile(self, event=None) -> None:
+        """
+        La chat è di nuovo visibile: scrive lo streaming rimasto in attesa
+        e rifà lo scroll in fondo saltato mentre era nascosta.
+        """
+        if self._pending_streaming and not self._streaming_dirty:
+            self._pending_streaming = False
+            self._streaming_dirty = True
+            self._streaming_after_id = self.after_idle(self._flush_streaming)
+        if self._scroll_dopo_ritorno:
+            self._scroll_dopo_ritorno = False
             self._scroll_in_basso()
 
     def finalizza_streaming(self) -> None:
@@ -466,12 +1017,30 @@ class ChatView(ctk.CTkFrame):
         Applica il rendering markdown completo al testo accumulato
         e resetta le variabili di streaming per il prossimo messaggio.
         """
+        # Il rendering finale riscrive comunque tutto il testo:
+        # i pezzi ancora in attesa non vanno scritti a parte
+        self._annulla_flush_streaming()
+
+        testo_completo = "".join(self._pezzi_streaming)
+        self._pezzi_streaming.clear()
+
+        if testo_completo and self._label_streaming is None:
+            # Streaming più breve di un flush: la bolla non esiste ancora
+            self._crea_bolla_streaming()
+
         # Rendering markdown finale: ri-renderizza il testo completo con formattazione
-        if self._testo_streaming and self._label_streaming:
-            self._label_streaming._imposta_testo(self._testo_streaming)
+        if testo_completo and self._label_streaming:
+            self._label_streaming._imposta_testo(testo_completo)
+            # Da ora la bolla si può rilasciare e ricreare come le altre
+            self._record_streaming["contenuto"] = testo_completo
             self._scroll_in_basso()
-        self._testo_streaming = ""
         self._label_streaming = None
+        self._record_streaming = None
+
+    def _crea_bolla_streaming(self) -> None:
+        """Crea la bolla (vuota) che riceve il testo in streaming."""
+        self._record_streaming = self._nuovo_messaggio("assistant", "")
+        self._label_streaming = self._record_streaming["widget"]
 
     def mostra_approvazione(self, codice: str = "") -> None:
         """
@@ -480,6 +1049,9 @@ class ChatView(ctk.CTkFrame):
         Args:
             codice: Il codice che l'IA vuole eseguire (per mostrarlo all'utente)
         """
+        if len(codice) > MAX_ANTEPRIMA_CODICE:
+            codice = codice[:MAX_ANTEPRIMA_CODICE] + "…"
+        self._codice_var.set(codice)
         self._frame_approvazione.pack(fill="x", padx=0, pady=0, before=self._entry_messaggio.master)
         logger.info("⚠️ Richiesta approvazione mostrata")
 
@@ -494,14 +1066,45 @@ class ChatView(ctk.CTkFrame):
         Args:
             testo: Il testo da mostrare (es. "Sta scrivendo...", "Pronto")
         """
-        self._label_stato.configure(text=testo)
+        # Lo streaming ripete lo stesso stato ad ogni flush: niente ridisegni inutili
+        if testo != self._var_stato.get():
+            self._var_stato.set(testo)
 
     def pulisci_chat(self) -> None:
-        """Rimuove tutti i messaggi dalla chat."""
-        for widget in self._scroll_frame.winfo_children():
-            widget.destroy()
-        self._testo_streaming = ""
+        """
+        Rimuove tutti i messaggi dalla chat.
+
+        Invece di rilasciare i messaggi uno per uno sostituiamo l'intero
+        frame scrollabile: niente lavoro per ogni record (segnaposto, pool,
+        indici) e layout e posizione di scroll ripartono da zero.
+        NOTA: la destroy() del vecchio frame distrugge comunque, lato Python,
+        ogni widget figlio (slot e bolle) uno per uno. Le bolle del pool sono
+        figlie del vecchio frame e non possono essere spostate nel nuovo,
+        quindi il pool riparte vuoto.
+        """
+        self._annulla_flush_streaming()
+        if self._after_reflow is not None:
+            self.after_cancel(self._after_reflow)
+            self._after_reflow = None
+
+        # Il nuovo frame va nella stessa posizione del vecchio: prima della
+        # barra di approvazione se è visibile, altrimenti prima dell'input
+        if self._frame_approvazione.winfo_manager():
+            prima_di = self._frame_approvazione
+        else:
+            prima_di = self._entry_messaggio.master
+        vecchio = self._scroll_frame
+        self._crea_area_messaggi(before=prima_di)
+        vecchio.destroy()
+
+        for pool in self._pool_bolle.values():
+            pool.clear()
+        self._messaggi.clear()
+        self._indici_vivi.clear()
+        self._recenti.clear()
+        self._pezzi_streaming.clear()
         self._label_streaming = None
+        self._record_streaming = None
         self._aggiungi_messaggio_benvenuto()
         logger.info("🧹 Chat pulita")
 
@@ -517,9 +1120,33 @@ class ChatView(ctk.CTkFrame):
         self._btn_invia.configure(state=stato)
 
     def _scroll_in_basso(self) -> None:
-        """Scrolla l'area messaggi fino in fondo."""
-        self._scroll_frame.update_idletasks()
-        self._scroll_frame._parent_canvas.yview_moveto(1.0)
+        """
+        Scrolla l'area messaggi fino in fondo.
+        
+        Lo scroll non è immediato: viene fatto una volta sola al prossimo
+        giro di idle, quando Tk ha già sistemato il layout. Così più
+        messaggi/pezzi di streaming nello stesso giro costano un solo
+        scroll e nessun update_idletasks forzato.
+
+        Se la chat non è visibile (finestra minimizzata) lo scroll viene
+        rimandato a quando torna visibile (vedi _on_ritorno_visibile).
+        """
+        if self._scroll_pending:
+            return
+        if not self._scroll_frame.winfo_viewable():
+            self._scroll_dopo_ritorno = True
+            return
+        self._scroll_pending = True
+        self.after_idle(self._esegui_scroll)
+
+    def _esegui_scroll(self) -> None:
+        """Esegue lo scroll in fondo pianificato da _scroll_in_basso()."""
+        self._scroll_pending = False
+        canvas = self._scroll_frame._parent_canvas
+        # La scrollregion viene aggiornata da CustomTkinter con un evento
+        # <Configure> che può arrivare dopo di noi: la allineiamo qui
+        canvas.configure(scrollregion=canvas.bbox("all"))
+        canvas.yview_moveto(1.0)
 
     def focus_input(self) -> None:
         """Mette il focus sul campo di input (per iniziare subito a scrivere)."""
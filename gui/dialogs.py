@@ -7,16 +7,82 @@ import logging
 import customtkinter as ctk
 from typing import Optional, Callable
 
+from gui.fonts import ottieni_font
+
 # Logger per questo modulo
 logger = logging.getLogger("AutoBotOx.GUI.Dialogs")
 
+# Oltre questa lunghezza i dettagli di debug vengono troncati:
+# il widget Text di Tk diventa lentissimo con testi di diversi MB
+MAX_CARATTERI_DEBUG = 200_000
+
 
-class DialogoErrore(ctk.CTkToplevel):
+def _inserisci_testo_lungo(textbox: ctk.CTkTextbox, testo: str) -> None:
+    """
+    Inserisce un testo (anche molto lungo) in un CTkTextbox in sola lettura.
+    
+    Durante l'inserimento disattiviamo word-wrap e undo: così Tk non deve
+    calcolare gli a capo riga per riga né salvare la storia delle modifiche.
+    Il word-wrap viene riattivato alla fine, quando il testo è già dentro.
+    
+    Args:
+        textbox: Il CTkTextbox di destinazione
+        testo: Il testo da inserire
+    """
+    textbox.configure(wrap="none", undo=False, autoseparators=False)
+    textbox.insert("end", testo)
+    textbox.configure(wrap="word", state="disabled")
+
+
+class _DialogoBase(ctk.CTkToplevel):
+    """
+    Base comune delle finestre di dialogo.
+    
+    Come funziona (per principianti):
+    - La finestra viene nascosta (withdraw) appena creata
+    - Poi vengono costruiti tutti i widget con _costruisci_ui()
+    - Solo alla fine viene mostrata (deiconify): Tk la disegna una volta
+      sola, già completa e centrata, invece di ridisegnarla ad ogni widget
+    """
+
+    # Dimensioni della finestra (ogni dialogo imposta le sue)
+    LARGHEZZA = 450
+    ALTEZZA = 250
+
+    def _centra_finestra(self) -> None:
+        """
+        Dimensiona e centra la finestra sullo schermo con una sola
+        chiamata a geometry(). Le dimensioni dello schermo sono sempre
+        disponibili, quindi non serve forzare il layout con update_idletasks().
+        """
+        x = (self.winfo_screenwidth() - self.LARGHEZZA) // 2
+        y = (self.winfo_screenheight() - self.ALTEZZA) // 2
+        self.geometry(f"{self.LARGHEZZA}x{self.ALTEZZA}+{x}+{y}")
+
+    def _mostra_pronta(self, master, modale: bool = True) -> None:
+        """
+        Mostra la finestra ormai completa.
+        
+        Args:
+            master: La finestra genitore
+            modale: True per bloccare l'interazione con la finestra principale
+        """
+        self.deiconify()
+        self.transient(master)
+        if modale:
+            # grab_set() funziona solo su una finestra già visibile
+            self.grab_set()
+
+
+class DialogoErrore(_DialogoBase):
     """
     Finestra di dialogo per mostrare errori.
     Appare come un popup sopra la finestra principale.
     """
 
+    LARGHEZZA = 450
+    ALTEZZA = 250
+
     def __init__(self, master, titolo: str, messaggio: str, **kwargs):
         """
         Crea e mostra una finestra di errore.
@@ -28,26 +94,32 @@ class DialogoErrore(ctk.CTkToplevel):
         """
         super().__init__(master, **kwargs)
 
+        # Nascosta finché non è completa (vedi _DialogoBase)
+        self.withdraw()
+
         self.title(titolo)
-        self.geometry("450x250")
+        self._centra_finestra()
         self.resizable(False, False)
 
-        # Rendi la finestra modale (blocca l'interazione con la finestra principale)
-        self.grab_set()
-        self.transient(master)
+        self._costruisci_ui(titolo, messaggio)
+        self._mostra_pronta(master)
 
+        logger.info(f"❌ Dialogo errore mostrato: {titolo}")
+
+    def _costruisci_ui(self, titolo: str, messaggio: str) -> None:
+        """Costruisce icona, titolo, messaggio e pulsante OK."""
         # Icona errore
         ctk.CTkLabel(
             self,
             text="❌",
-            font=ctk.CTkFont(size=40)
+            font=ottieni_font(40)
         ).pack(pady=(20, 5))
 
         # Titolo errore
         ctk.CTkLabel(
             self,
             text=titolo,
-            font=ctk.CTkFont(size=16, weight="bold"),
+            font=ottieni_font(16, "bold"),
             text_color="#f44336"
         ).pack(pady=5)
 
@@ -55,7 +127,7 @@ class DialogoErrore(ctk.CTkToplevel):
         ctk.CTkLabel(
             self,
             text=messaggio,
-            font=ctk.CTkFont(size=13),
+            font=ottieni_font(13),
             wraplength=400,
             justify="center"
         ).pack(pady=10, padx=20)
@@ -68,24 +140,16 @@ class DialogoErrore(ctk.CTkToplevel):
             command=self.destroy
         ).pack(pady=15)
 
-        # Centra la finestra
-        self._centra_finestra()
-        logger.info(f"❌ Dialogo errore mostrato: {titolo}")
-
-    def _centra_finestra(self) -> None:
-        """Centra la finestra sullo schermo."""
-        self.update_idletasks()
-        x = (self.winfo_screenwidth() - 450) // 2
-        y = (self.winfo_screenheight() - 250) // 2
-        self.geometry(f"450x250+{x}+{y}")
-
 
-class DialogoConferma(ctk.CTkToplevel):
+class DialogoConferma(_DialogoBase):
     """
     Finestra di dialogo per conferme (Sì/No).
     Usata per chiedere conferma prima di azioni importanti.
     """
 
+    LARGHEZZA = 450
+    ALTEZZA = 220
+
     def __init__(
         self,
         master,
@@ -107,27 +171,35 @@ class DialogoConferma(ctk.CTkToplevel):
         """
         super().__init__(master, **kwargs)
 
+        # Nascosta finché non è completa (vedi _DialogoBase)
+        self.withdraw()
+
         self._callback_conferma = callback_conferma
         self._callback_annulla = callback_annulla
 
         self.title(titolo)
-        self.geometry("450x220")
+        self._centra_finestra()
         self.resizable(False, False)
-        self.grab_set()
-        self.transient(master)
 
+        self._costruisci_ui(messaggio)
+        self._mostra_pronta(master)
+
+        logger.info(f"❓ Dialogo conferma mostrato: {titolo}")
+
+    def _costruisci_ui(self, messaggio: str) -> None:
+        """Costruisce icona, messaggio e pulsanti Conferma/Annulla."""
         # Icona domanda
         ctk.CTkLabel(
             self,
             text="❓",
-            font=ctk.CTkFont(size=40)
+            font=ottieni_font(40)
         ).pack(pady=(20, 5))
 
         # Messaggio
         ctk.CTkLabel(
             self,
             text=messaggio,
-            font=ctk.CTkFont(size=13),
+            font=ottieni_font(13),
             wraplength=400,
             justify="center"
         ).pack(pady=10, padx=20)
@@ -154,9 +226,6 @@ class DialogoConferma(ctk.CTkToplevel):
             command=self._on_annulla
         ).pack(side="left", padx=10)
 
-        self._centra_finestra()
-        logger.info(f"❓ Dialogo conferma mostrato: {titolo}")
-
     def _on_conferma(self) -> None:
         """Gestisce la conferma."""
         if self._callback_conferma:
@@ -169,20 +238,16 @@ class DialogoConferma(ctk.CTkToplevel):
             self._callback_annulla()
         self.destroy()
 
-    def _centra_finestra(self) -> None:
-        """Centra la finestra sullo schermo."""
-        self.update_idletasks()
-        x = (self.winfo_screenwidth() - 450) // 2
-        y = (self.winfo_screenheight() - 220) // 2
-        self.geometry(f"450x220+{x}+{y}")
-
 
-class DialogoDebug(ctk.CTkToplevel):
+class DialogoDebug(_DialogoBase):
     """
     Finestra di debug per mostrare informazioni tecniche dettagliate.
     Utile per il troubleshooting quando qualcosa non funziona.
     """
 
+    LARGHEZZA = 600
+    ALTEZZA = 400
+
     def __init__(self, master, titolo: str, dettagli: str, **kwargs):
         """
         Crea e mostra una finestra di debug.
@@ -194,27 +259,44 @@ class DialogoDebug(ctk.CTkToplevel):
         """
         super().__init__(master, **kwargs)
 
+        # Nascosta finché non è completa (vedi _DialogoBase)
+        self.withdraw()
+
         self.title(f"🔍 Debug - {titolo}")
-        self.geometry("600x400")
-        self.transient(master)
+        self._centra_finestra()
 
+        self._costruisci_ui(titolo, dettagli)
+        self._mostra_pronta(master, modale=False)
+
+        logger.info(f"🔍 Dialogo debug mostrato: {titolo}")
+
+    def _costruisci_ui(self, titolo: str, dettagli: str) -> None:
+        """Costruisce titolo, area dettagli e pulsanti Copia/Chiudi."""
         # Titolo
         ctk.CTkLabel(
             self,
             text=f"🔍 {titolo}",
-            font=ctk.CTkFont(size=16, weight="bold")
+            font=ottieni_font(16, "bold")
         ).pack(pady=(15, 5), padx=15, anchor="w")
 
         # Area testo con i dettagli
         self._textbox = ctk.CTkTextbox(
             self,
-            font=ctk.CTkFont(family="Consolas", size=11),
+            font=ottieni_font(11, family="Consolas"),
             fg_color=("gray95", "gray10"),
             wrap="word"
         )
         self._textbox.pack(fill="both", expand=True, padx=15, pady=10)
-        self._textbox.insert("end", dettagli)
-        self._textbox.configure(state="disabled")
+
+        # Nel widget mostriamo al massimo MAX_CARATTERI_DEBUG caratteri,
+        # il pulsante "Copia" copia comunque il testo completo
+        testo_mostrato = dettagli
+        if len(dettagli) > MAX_CARATTERI_DEBUG:
+            testo_mostrato = (
+                dettagli[:MAX_CARATTERI_DEBUG]
+                + "\n…[troncato: usa 📋 Copia per il testo completo]"
+            )
+        _inserisci_testo_lungo(self._textbox, testo_mostrato)
 
         # Frame pulsanti
         frame_btn = ctk.CTkFrame(self, fg_color="transparent")
@@ -234,29 +316,22 @@ class DialogoDebug(ctk.CTkToplevel):
             command=self.destroy
         ).pack(side="right", padx=5)
 
-        self._centra_finestra()
-        logger.info(f"🔍 Dialogo debug mostrato: {titolo}")
-
     def _copia_negli_appunti(self, testo: str) -> None:
         """Copia il testo negli appunti del sistema."""
         self.clipboard_clear()
         self.clipboard_append(testo)
         logger.info("📋 Dettagli debug copiati negli appunti")
 
-    def _centra_finestra(self) -> None:
-        """Centra la finestra sullo schermo."""
-        self.update_idletasks()
-        x = (self.winfo_screenwidth() - 600) // 2
-        y = (self.winfo_screenheight() - 400) // 2
-        self.geometry(f"600x400+{x}+{y}")
-
 
-class DialogoApprovazioneCodice(ctk.CTkToplevel):
+class DialogoApprovazioneCodice(_DialogoBase):
     """
     Finestra speciale per approvare/rifiutare l'esecuzione del codice.
     Mostra il codice che l'IA vuole eseguire con evidenziazione.
     """
 
+    LARGHEZZA = 650
+    ALTEZZA = 450
+
     def __init__(
         self,
         master,
@@ -278,46 +353,55 @@ class DialogoApprovazioneCodice(ctk.CTkToplevel):
         """
         super().__init__(master, **kwargs)
 
+        # Nascosta finché non è completa (vedi _DialogoBase)
+        self.withdraw()
+
         self._callback_approva = callback_approva
         self._callback_rifiuta = callback_rifiuta
 
         self.title("⚠️ Approvazione Esecuzione Codice")
-        self.geometry("650x450")
-        self.grab_set()
-        self.transient(master)
+        self._centra_finestra()
 
+        self._costruisci_ui(codice, linguaggio)
+        self._mostra_pronta(master)
+
+        logger.info("⚠️ Dialogo approvazione codice mostrato")
+
+    def _costruisci_ui(self, codice: str, linguaggio: str) -> None:
+        """Costruisce avvisi, area codice e pulsanti Approva/Rifiuta."""
         # Avviso
         ctk.CTkLabel(
             self,
             text="⚠️ L'IA vuole eseguire il seguente codice:",
-            font=ctk.CTkFont(size=15, weight="bold"),
+            font=ottieni_font(15, "bold"),
             text_color="orange"
         ).pack(pady=(15, 5), padx=15, anchor="w")
 
         ctk.CTkLabel(
             self,
             text=f"Linguaggio: {linguaggio.upper()}",
-            font=ctk.CTkFont(size=12),
+            font=ottieni_font(12),
             text_color="gray60"
         ).pack(padx=15, anchor="w")
 
         # Area codice
         self._textbox = ctk.CTkTextbox(
             self,
-            font=ctk.CTkFont(family="Consolas", size=12),
+            font=ottieni_font(12, family="Consolas"),
             fg_color="#0d0d0d",
             text_color="#00ff00",
             wrap="word"
         )
         self._textbox.pack(fill="both", expand=True, padx=15, pady=10)
-        self._textbox.insert("end", codice)
-        self._textbox.configure(state="disabled")
+        # Il codice da approvare NON va mai troncato: l'utente deve poter
+        # vedere tutto quello che verrà eseguito
+        _inserisci_testo_lungo(self._textbox, codice)
 
         # Avviso sicurezza
         ctk.CTkLabel(
             self,
             text="🛡️ Controlla attentamente il codice prima di approvare!",
-            font=ctk.CTkFont(size=11),
+            font=ottieni_font(11),
             text_color="orange"
         ).pack(padx=15, pady=(0, 5))
 
@@ -332,7 +416,7 @@ class DialogoApprovazioneCodice(ctk.CTkToplevel):
             height=35,
             fg_color="#2e7d32",
             hover_color="#1b5e20",
-            font=ctk.CTkFont(size=13, weight="bold"),
+            font=ottieni_font(13, "bold"),
             command=self._on_approva
         ).pack(side="left", padx=10)
 
@@ -343,13 +427,10 @@ class DialogoApprovazioneCodice(ctk.CTkToplevel):
             height=35,
             fg_color="#c62828",
             hover_color="#b71c1c",
-            font=ctk.CTkFont(size=13, weight="bold"),
+            font=ottieni_font(13, "bold"),
             command=self._on_rifiuta
         ).pack(side="right", padx=10)
 
-        self._centra_finestra()
-        logger.info("⚠️ Dialogo approvazione codice mostrato")
-
     def _on_approva(self) -> None:
         """Gestisce l'approvazione."""
         if self._callback_approva:
@@ -361,10 +442,3 @@ class DialogoApprovazioneCodice(ctk.CTkToplevel):
         if self._callback_rifiuta:
             self._callback_rifiuta()
         self.destroy()
-
-    def _centra_finestra(self) -> None:
-        """Centra la finestra sullo schermo."""
-        self.update_idletasks()
-        x = (self.winfo_screenwidth() - 650) // 2
-        y = (self.winfo_screenheight() - 450) // 2
-        self.geometry(f"650x450+{x}+{y}")
@@ -0,0 +1,43 @@
+# ============================================
+# Fonts (Cache dei Font) - AutoBot Ox
+# Un solo oggetto CTkFont per ogni combinazione
+# di dimensione, peso e famiglia
+# ============================================
+
+import customtkinter as ctk
+from typing import Dict, Optional, Tuple
+
+# Font già creati, indicizzati per (dimensione, peso, famiglia)
+_FONTS: Dict[Tuple[int, str, Optional[str]], ctk.CTkFont] = {}
+
+
+def ottieni_font(size: int, weight: str = "normal", family: Optional[str] = None) -> ctk.CTkFont:
+    """
+    Restituisce un CTkFont condiviso con le caratteristiche richieste.
+
+    Come funziona (per principianti):
+    - Ogni ctk.CTkFont(...) registra un nuovo font nell'interprete Tk
+    - Con centinaia di widget (es. le bolle della chat) sono centinaia di font
+      identici: qui li creiamo una volta sola e poi li riusiamo
+    - Il font viene creato al primo utilizzo, quando la finestra Tk esiste già
+
+    NOTA: il font è condiviso, quindi non va modificato con .configure()
+    (cambierebbe in tutti i widget che lo usano).
+
+    Args:
+        size: Dimensione del font
+        weight: "normal" o "bold"
+        family: Famiglia del font (None = quella predefinita del tema)
+
+    Returns:
+        Il CTkFont condiviso
+    """
+    chiave = (size, weight, family)
+    font = _FONTS.get(chiave)
+    if font is None:
+        if family is None:
+            font = ctk.CTkFont(size=size, weight=weight)
+        else:
+            font = ctk.CTkFont(family=family, size=size, weight=weight)
+        _FONTS[chiave] = font
+    return font
@@ -9,13 +9,24 @@
 # ============================================
 
 import logging
+import tkinter as tk
 import customtkinter as ctk
-from tkinter import filedialog
-from typing import Callable, Optional, Dict
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Dict, List, Tuple
+
+from gui.fonts import ottieni_font
 
 # Logger per questo modulo
 logger = logging.getLogger("AutoBotOx.GUI.Sidebar")
 
+# Attesa (ms) prima di avvisare l'app di un cambio di provider o di un
+# interruttore: più clic ravvicinati diventano un'unica notifica
+RITARDO_CALLBACK_MS = 80
+
+# Segnaposto per "nessun valore ancora comunicato all'app"
+_MAI_INVIATO = object()
+
 
 class Sidebar(ctk.CTkFrame):
     """
@@ -27,7 +38,8 @@ class Sidebar(ctk.CTkFrame):
     Per chi è nuovo al codice:
     - CTkFrame è un "contenitore" rettangolare dove mettiamo altri elementi
     - Ogni elemento (pulsante, campo testo, ecc.) viene posizionato dentro
-    - Usiamo pack() per mettere gli elementi uno sotto l'altro
+    - Usiamo grid() su un'unica colonna per mettere gli elementi uno
+      sotto l'altro (una riga per elemento)
     """
 
     def __init__(
@@ -62,46 +74,155 @@ class Sidebar(ctk.CTkFrame):
         self._callback_export = callback_export
         self._callback_salva_apikey = callback_salva_apikey
 
+        # Tema attivo (0 = chiaro, 1 = scuro), letto una volta sola: le coppie
+        # di colori (chiaro, scuro) vengono risolte qui con _colore() invece
+        # che da ogni widget. L'app imposta il tema prima di creare la sidebar
+        # e non lo cambia più
+        self._indice_tema = 0 if ctk.get_appearance_mode() == "Light" else 1
+
         # Configura lo stile della sidebar
         self.configure(
             width=280,
             corner_radius=0,
-            fg_color=("gray90", "gray13")  # (tema chiaro, tema scuro)
+            fg_color=self._colore(("gray90", "gray13"))  # (tema chiaro, tema scuro)
         )
 
+        # Variabile del provider: esiste subito, così imposta_provider()
+        # e ottieni_provider() funzionano anche durante la costruzione
+        self._var_provider = ctk.StringVar(value="locale")
+        self._apikey_visibile = False
+
+        # Chiamate ai metodi pubblici arrivate prima che la sezione
+        # interessata esistesse: vengono eseguite a costruzione finita
+        self._chiamate_in_attesa: List[Tuple[Callable, tuple]] = []
+
+        # Ultimi valori mostrati da stato server e cartella (None = nessuno):
+        # aggiornamenti con lo stesso valore non riconfigurano le label
+        self._ultimo_stato_server: Optional[bool] = None
+        self._ultima_cartella: Optional[str] = None
+
+        # Notifiche all'app in attesa (chiave -> id di after) e ultimo valore
+        # comunicato per ogni chiave (vedi _pianifica_callback)
+        self._after_callback: Dict[str, str] = {}
+        self._valori_inviati: Dict[str, object] = {}
+
+        # Avvisi da mostrare/nascondere al termine del blocco di
+        # aggiornamenti in corso (vedi _aggiornamenti_in_blocco)
+        self._profondita_blocco = 0
+        self._avvisi_da_applicare: Dict[ctk.CTkLabel, bool] = {}
+
         # Costruisci tutti gli elementi dell'interfaccia
         self._costruisci_ui()
-        logger.info("📱 Sidebar costruita")
+        logger.info("📱 Sidebar in costruzione")
 
     def _costruisci_ui(self) -> None:
-        """Costruisce tutti gli elementi della sidebar."""
+        """
+        Avvia la costruzione della sidebar, una sezione alla volta.
+
+        Come funziona (per principianti):
+        - Creare una trentina di widget CTk tutti insieme blocca la finestra
+          finché non sono pronti (avvio lento, rettangoli neri)
+        - Mostriamo subito un "Caricamento..." e costruiamo una sezione per
+          ogni giro del ciclo eventi di Tk: tra una sezione e l'altra la
+          finestra può ridisegnarsi e restare reattiva
+        - La scritta usa place(), che la sovrappone senza spostare nulla
+        """
+        self._label_caricamento = ctk.CTkLabel(
+            self,
+            text="Caricamento...",
+            font=ottieni_font(12),
+            text_color=self._colore(("gray40", "gray60"))
+        )
+        self._label_caricamento.place(relx=0.5, rely=0.5, anchor="center")
+
+        # Una sola colonna che occupa tutta la larghezza; _riga è la prossima
+        # riga libera (vedi _aggiungi_riga)
+        self.grid_columnconfigure(0, weight=1)
+        self._riga = 0
+
+        self._costruzione_in_corso = True
+        self._coda_costruzione = deque([
+            self._costruisci_titolo,
+            self._costruisci_provider,
+            self._costruisci_apikey,
+            self._costruisci_sicurezza,
+            self._costruisci_cartella,
+            self._costruisci_azioni,
+            self._costruisci_footer,
+        ])
+        self.after_idle(self._costruisci_prossima_sezione)
+
+    def _costruisci_prossima_sezione(self) -> None:
+        """Costruisce la prossima sezione in coda e pianifica la successiva."""
+        self._coda_costruzione.popleft()()
+
+        if self._coda_costruzione:
+            self._label_caricamento.lift()
+            self.after(0, self._costruisci_prossima_sezione)
+            return
+
+        # Tutte le sezioni pronte: via il segnaposto e applica le
+        # impostazioni arrivate nel frattempo (es. dal file di configurazione)
+        self._label_caricamento.place_forget()
+        self._label_caricamento.destroy()
+        self._costruzione_in_corso = False
+        with self._aggiornamenti_in_blocco():
+            for metodo, args in self._chiamate_in_attesa:
+                metodo(*args)
+        self._chiamate_in_attesa.clear()
+        logger.info("📱 Sidebar costruita")
 
-        # ========== LOGO / TITOLO ==========
-        titolo_frame = ctk.CTkFrame(self, fg_color="transparent")
-        titolo_frame.pack(fill="x", padx=15, pady=(15, 5))
+    def _rimanda_se_in_costruzione(self, metodo: Callable, *args) -> bool:
+        """
+        Se la sidebar è ancora in costruzione, mette da parte la chiamata.
 
-        ctk.CTkLabel(
-            titolo_frame,
+        Args:
+            metodo: Il metodo pubblico da richiamare a costruzione finita
+            args: I suoi argomenti
+
+        Returns:
+            True se la chiamata è stata rimandata (il chiamante deve uscire)
+        """
+        if not self._costruzione_in_corso:
+            return False
+        self._chiamate_in_attesa.append((metodo, args))
+        return True
+
+    # ==========================================
+    # Sezioni della sidebar (una per giro del ciclo eventi)
+    # ==========================================
+
+    def _costruisci_titolo(self) -> None:
+        """Logo e titolo dell'applicazione."""
+
+        # ========== LOGO / TITOLO ==========
+        # Le etichette vanno direttamente nella sidebar, senza un frame
+        # contenitore (un canvas in meno da gestire)
+        titolo = ctk.CTkLabel(
+            self,
             text="🤖 AutoBot Ox",
-            font=ctk.CTkFont(size=20, weight="bold"),
-            text_color=("gray10", "gray90")
-        ).pack(anchor="w")
+            font=ottieni_font(20, "bold"),
+            text_color=self._colore(("gray10", "gray90"))
+        )
+        self._aggiungi_riga(titolo, sticky="w", padx=15, pady=(15, 0))
 
-        ctk.CTkLabel(
-            titolo_frame,
+        versione = ctk.CTkLabel(
+            self,
             text="v1.0.0 - AI Agent Desktop",
-            font=ctk.CTkFont(size=11),
-            text_color=("gray40", "gray60")
-        ).pack(anchor="w")
+            font=ottieni_font(11),
+            text_color=self._colore(("gray40", "gray60"))
+        )
+        self._aggiungi_riga(versione, sticky="w", padx=15, pady=(0, 5))
 
         # Separatore
         self._crea_separatore()
 
+    def _costruisci_provider(self) -> None:
+        """Scelta del provider LLM e stato del server locale."""
+
         # ========== SELEZIONE PROVIDER ==========
         self._crea_sezione_label("🔌 Provider LLM")
 
-        self._var_provider = ctk.StringVar(value="locale")
-        
         # Radio button per provider locale
         self._radio_locale = ctk.CTkRadioButton(
             self,
@@ -109,11 +230,11 @@ class Sidebar(ctk.CTkFrame):
             variable=self._var_provider,
             value="locale",
             command=self._on_cambio_provider,
-            font=ctk.CTkFont(size=13),
+            font=ottieni_font(13),
             radiobutton_width=18,
             radiobutton_height=18
         )
-        self._radio_locale.pack(fill="x", padx=20, pady=(2, 2))
+        self._aggiungi_riga(self._radio_locale, padx=20, pady=(2, 2))
 
         # Radio button per provider cloud
         self._radio_cloud = ctk.CTkRadioButton(
@@ -122,27 +243,27 @@ class Sidebar(ctk.CTkFrame):
             variable=self._var_provider,
             value="cloud",
             command=self._on_cambio_provider,
-            font=ctk.CTkFont(size=13),
+            font=ottieni_font(13),
             radiobutton_width=18,
             radiobutton_height=18
         )
-        self._radio_cloud.pack(fill="x", padx=20, pady=(2, 8))
+        self._aggiungi_riga(self._radio_cloud, padx=20, pady=(2, 8))
 
         # Indicatore stato server locale
-        self._frame_stato_locale = ctk.CTkFrame(self, fg_color="transparent")
-        self._frame_stato_locale.pack(fill="x", padx=20, pady=(0, 5))
-
         self._label_stato_locale = ctk.CTkLabel(
-            self._frame_stato_locale,
+            self,
             text="● Offline",
-            font=ctk.CTkFont(size=11),
+            font=ottieni_font(11),
             text_color="red"
         )
-        self._label_stato_locale.pack(anchor="w")
+        self._aggiungi_riga(self._label_stato_locale, sticky="w", padx=20, pady=(0, 5))
 
         # Separatore
         self._crea_separatore()
 
+    def _costruisci_apikey(self) -> None:
+        """Campo della API key di OpenRouter."""
+
         # ========== API KEY ==========
         self._crea_sezione_label("🔑 API Key OpenRouter")
 
@@ -150,14 +271,14 @@ class Sidebar(ctk.CTkFrame):
             self,
             placeholder_text="Inserisci la tua API key...",
             show="*",  # Nasconde i caratteri come una password
-            font=ctk.CTkFont(size=12),
+            font=ottieni_font(12),
             height=32
         )
-        self._entry_apikey.pack(fill="x", padx=15, pady=(2, 5))
+        self._aggiungi_riga(self._entry_apikey, padx=15, pady=(2, 5))
 
         # Frame per pulsanti API key
         frame_apikey_btn = ctk.CTkFrame(self, fg_color="transparent")
-        frame_apikey_btn.pack(fill="x", padx=15, pady=(0, 5))
+        self._aggiungi_riga(frame_apikey_btn, padx=15, pady=(0, 5))
 
         self._btn_mostra_key = ctk.CTkButton(
             frame_apikey_btn,
@@ -165,7 +286,7 @@ class Sidebar(ctk.CTkFrame):
             width=35,
             height=28,
             command=self._toggle_mostra_apikey,
-            font=ctk.CTkFont(size=14)
+            font=ottieni_font(14)
         )
         self._btn_mostra_key.pack(side="left", padx=(0, 5))
 
@@ -175,136 +296,78 @@ class Sidebar(ctk.CTkFrame):
             width=80,
             height=28,
             command=self._on_salva_apikey,
-            font=ctk.CTkFont(size=12)
+            font=ottieni_font(12)
         )
         self._btn_salva_key.pack(side="left")
 
-        self._apikey_visibile = False
-
         # Separatore
         self._crea_separatore()
 
+    def _costruisci_sicurezza(self) -> None:
+        """Interruttori di sicurezza (auto-run, computer use, vision)."""
+
         # ========== SICUREZZA ==========
         self._crea_sezione_label("🛡️ Sicurezza")
 
         # Toggle Auto-Run
-        self._frame_autorun = ctk.CTkFrame(self, fg_color="transparent")
-        self._frame_autorun.pack(fill="x", padx=15, pady=(2, 5))
-
-        ctk.CTkLabel(
-            self._frame_autorun,
-            text="Auto-Run Codice:",
-            font=ctk.CTkFont(size=13)
-        ).pack(side="left")
-
-        self._switch_autorun = ctk.CTkSwitch(
-            self._frame_autorun,
-            text="",
-            command=self._on_toggle_autorun,
-            width=40,
-            onvalue=True,
-            offvalue=False
-        )
-        self._switch_autorun.pack(side="right")
-
-        # Avviso auto-run
-        self._label_avviso_autorun = ctk.CTkLabel(
-            self,
-            text="⚠️ Con Auto-Run attivo, il codice\nviene eseguito senza conferma!",
-            font=ctk.CTkFont(size=10),
-            text_color="orange",
-            justify="left"
+        self._switch_autorun, self._label_avviso_autorun = self._crea_interruttore(
+            "Auto-Run Codice:",
+            self._on_toggle_autorun,
+            "⚠️ Con Auto-Run attivo, il codice\nviene eseguito senza conferma!",
+            colore_avviso="orange",
+            pady=(2, 5)
         )
-        # Inizialmente nascosto, mostrato solo quando auto-run è attivo
 
         # Toggle Computer Use (controllo mouse/tastiera)
-        self._frame_computer_use = ctk.CTkFrame(self, fg_color="transparent")
-        self._frame_computer_use.pack(fill="x", padx=15, pady=(5, 2))
-
-        ctk.CTkLabel(
-            self._frame_computer_use,
-            text="🖱️ Computer Use:",
-            font=ctk.CTkFont(size=13)
-        ).pack(side="left")
-
-        self._switch_computer_use = ctk.CTkSwitch(
-            self._frame_computer_use,
-            text="",
-            command=self._on_toggle_computer_use,
-            width=40,
-            onvalue=True,
-            offvalue=False
-        )
-        self._switch_computer_use.pack(side="right")
-
-        # Avviso computer use
-        self._label_avviso_computer_use = ctk.CTkLabel(
-            self,
-            text="🖱️ L'IA può controllare mouse e\ntastiera! FAILSAFE: muovi il mouse\nnell'angolo in alto a sinistra.",
-            font=ctk.CTkFont(size=10),
-            text_color="#00bcd4",
-            justify="left"
+        self._switch_computer_use, self._label_avviso_computer_use = self._crea_interruttore(
+            "🖱️ Computer Use:",
+            self._on_toggle_computer_use,
+            "🖱️ L'IA può controllare mouse e\ntastiera! FAILSAFE: muovi il mouse\nnell'angolo in alto a sinistra.",
+            colore_avviso="#00bcd4"
         )
-        # Inizialmente nascosto
 
         # Toggle Vision (invio screenshot al modello)
-        self._frame_vision = ctk.CTkFrame(self, fg_color="transparent")
-        self._frame_vision.pack(fill="x", padx=15, pady=(5, 2))
-
-        ctk.CTkLabel(
-            self._frame_vision,
-            text="👁️ Vision:",
-            font=ctk.CTkFont(size=13)
-        ).pack(side="left")
-
-        self._switch_vision = ctk.CTkSwitch(
-            self._frame_vision,
-            text="",
-            command=self._on_toggle_vision,
-            width=40,
-            onvalue=True,
-            offvalue=False
-        )
-        self._switch_vision.pack(side="right")
-
-        # Avviso vision
-        self._label_avviso_vision = ctk.CTkLabel(
-            self,
-            text="👁️ Uno screenshot verrà inviato\nal modello con ogni messaggio.\nServe un modello con vision!",
-            font=ctk.CTkFont(size=10),
-            text_color="#8e24aa",
-            justify="left"
+        self._switch_vision, self._label_avviso_vision = self._crea_interruttore(
+            "👁️ Vision:",
+            self._on_toggle_vision,
+            "👁️ Uno screenshot verrà inviato\nal modello con ogni messaggio.\nServe un modello con vision!",
+            colore_avviso="#8e24aa"
         )
-        # Inizialmente nascosto
 
         # Separatore
         self._crea_separatore()
 
+    def _costruisci_cartella(self) -> None:
+        """Cartella di lavoro corrente."""
+
         # ========== CARTELLA DI LAVORO ==========
         self._crea_sezione_label("📂 Cartella di Lavoro")
 
         self._label_cartella = ctk.CTkLabel(
             self,
             text="Non selezionata",
-            font=ctk.CTkFont(size=11),
-            text_color=("gray40", "gray60"),
+            font=ottieni_font(11),
+            text_color=self._colore(("gray40", "gray60")),
             wraplength=240,
             justify="left"
         )
-        self._label_cartella.pack(fill="x", padx=15, pady=(2, 5))
+        self._aggiungi_riga(self._label_cartella, padx=15, pady=(2, 5))
 
         self._btn_cartella = ctk.CTkButton(
             self,
             text="📁 Seleziona Cartella",
             command=self._on_cambio_cartella,
             height=30,
-            font=ctk.CTkFont(size=12)
+            font=ottieni_font(12)
         )
-        self._btn_cartella.pack(fill="x", padx=15, pady=(0, 8))
+        self._aggiungi_riga(self._btn_cartella, padx=15, pady=(0, 8))
 
         # Separatore
         self._crea_separatore()
 
+    def _costruisci_azioni(self) -> None:
+        """Pulsanti nuova conversazione ed esportazione."""
+
         # ========== AZIONI ==========
         self._crea_sezione_label("⚡ Azioni")
 
@@ -313,57 +376,231 @@ class Sidebar(ctk.CTkFrame):
             text="🆕 Nuova Conversazione",
             command=self._on_nuova_chat,
             height=32,
-            font=ctk.CTkFont(size=13),
-            fg_color=("gray70", "gray30"),
-            hover_color=("gray60", "gray40")
+            font=ottieni_font(13),
+            fg_color=self._colore(("gray70", "gray30")),
+            hover_color=self._colore(("gray60", "gray40"))
         )
-        self._btn_nuova_chat.pack(fill="x", padx=15, pady=(2, 5))
+        self._aggiungi_riga(self._btn_nuova_chat, padx=15, pady=(2, 5))
 
         self._btn_export = ctk.CTkButton(
             self,
             text="💾 Esporta Cronologia",
             command=self._on_export,
             height=32,
-            font=ctk.CTkFont(size=13),
-            fg_color=("gray70", "gray30"),
-            hover_color=("gray60", "gray40")
+            font=ottieni_font(13),
+            fg_color=self._colore(("gray70", "gray30")),
+            hover_color=self._colore(("gray60", "gray40"))
         )
-        self._btn_export.pack(fill="x", padx=15, pady=(0, 8))
+        self._aggiungi_riga(self._btn_export, padx=15, pady=(0, 8))
 
-        # ========== SPAZIO FLESSIBILE ==========
-        # Questo frame espandibile spinge il pulsante info in basso
-        spacer = ctk.CTkFrame(self, fg_color="transparent")
-        spacer.pack(fill="both", expand=True)
+    def _costruisci_footer(self) -> None:
+        """Informazioni in basso (spinte sul fondo dallo spazio libero)."""
 
         # ========== INFO IN BASSO ==========
-        info_frame = ctk.CTkFrame(self, fg_color="transparent")
-        info_frame.pack(fill="x", padx=15, pady=(5, 15))
-
-        ctk.CTkLabel(
-            info_frame,
+        # La riga delle info è l'unica con peso: si prende tutto lo spazio
+        # libero e, ancorata in basso (sticky "s"), spinge le info sul fondo
+        info = ctk.CTkLabel(
+            self,
             text="Powered by Open Interpreter",
-            font=ctk.CTkFont(size=10),
-            text_color=("gray50", "gray50")
-        ).pack(anchor="w")
+            font=ottieni_font(10),
+            text_color=self._colore(("gray50", "gray50"))
+        )
+        self.grid_rowconfigure(self._riga, weight=1)
+        self._aggiungi_riga(info, sticky="sw", padx=15, pady=(5, 15))
 
     # ==========================================
     # Metodi helper per costruire la UI
     # ==========================================
 
     def _crea_separatore(self) -> None:
-        """Crea una linea separatrice orizzontale."""
-        sep = ctk.CTkFrame(self, height=1, fg_color=("gray75", "gray25"))
-        sep.pack(fill="x", padx=15, pady=8)
+        """
+        Crea una linea separatrice orizzontale.
+
+        Per una linea di 1 pixel basta un tk.Frame nativo: un CTkFrame
+        disegnerebbe su un proprio canvas e verrebbe seguito dal sistema di
+        scaling. Il colore viene scelto per il tema attivo (vedi _colore).
+        """
+        sep = tk.Frame(
+            self,
+            height=1,
+            bg=self._colore(("gray75", "gray25")),
+            highlightthickness=0,
+            bd=0
+        )
+        self._aggiungi_riga(sep, padx=15, pady=8)
 
     def _crea_sezione_label(self, testo: str) -> None:
-        """Crea un'etichetta di sezione (titoletto)."""
-        ctk.CTkLabel(
+        """
+        Crea un'etichetta di sezione (titoletto).
+
+        I titoletti sono testo statico (niente angoli arrotondati né hover):
+        un tk.Label nativo basta e non richiede il canvas di un CTkLabel.
+        """
+        label = tk.Label(
             self,
             text=testo,
-            font=ctk.CTkFont(size=14, weight="bold"),
-            text_color=("gray20", "gray80"),
-            anchor="w"
-        ).pack(fill="x", padx=15, pady=(5, 2))
+            font=self._apply_font_scaling(ottieni_font(14, "bold")),
+            fg=self._colore(("gray20", "gray80")),
+            bg=self.cget("fg_color"),
+            anchor="w",
+            bd=0,
+            highlightthickness=0
+        )
+        self._aggiungi_riga(label, padx=15, pady=(5, 2))
+
+    def _aggiungi_riga(self, widget, sticky: str = "ew", **opzioni) -> None:
+        """
+        Mette un widget nella prossima riga libera della sidebar.
+
+        Args:
+            widget: Il widget da posizionare (figlio diretto della sidebar)
+            sticky: Lati a cui ancorarlo (default: tutta la larghezza)
+            opzioni: Altre opzioni di grid() (padx, pady, ...)
+        """
+        # I widget CTk scalano da soli i margini (DPI), quelli tk nativi no
+        if not isinstance(widget, ctk.CTkBaseClass):
+            opzioni = self._apply_argument_scaling(opzioni)
+        widget.grid(row=self._riga, column=0, sticky=sticky, **opzioni)
+        self._riga += 1
+
+    def _crea_interruttore(self, etichetta: str, comando: Callable, avviso: str,
+                           colore_avviso: str, pady: Tuple[int, int] = (5, 2)
+                           ) -> Tuple[ctk.CTkSwitch, ctk.CTkLabel]:
+        """
+        Crea una riga "etichetta + interruttore" con il relativo avviso.
+
+        L'avviso occupa la riga successiva ma parte nascosto: la riga resta
+        riservata e grid() lo rimette al suo posto (vedi _mostra_avviso).
+
+        Args:
+            etichetta: Testo a sinistra dell'interruttore
+            comando: Funzione chiamata quando l'utente lo attiva/disattiva
+            avviso: Testo dell'avviso mostrato quando è attivo
+            colore_avviso: Colore del testo dell'avviso
+            pady: Margine verticale della riga dell'interruttore
+
+        Returns:
+            L'interruttore e l'etichetta di avviso
+        """
+        riga = ctk.CTkFrame(self, fg_color="transparent")
+        self._aggiungi_riga(riga, padx=15, pady=pady)
+
+        ctk.CTkLabel(
+            riga,
+            text=etichetta,
+            font=ottieni_font(13)
+        ).pack(side="left")
+
+        switch = ctk.CTkSwitch(
+            riga,
+            text="",
+            command=comando,
+            width=40,
+            onvalue=True,
+            offvalue=False
+        )
+        switch.pack(side="right")
+
+        label_avviso = ctk.CTkLabel(
+            self,
+            text=avviso,
+            font=ottieni_font(10),
+            text_color=colore_avviso,
+            justify="left"
+        )
+        self._aggiungi_riga(label_avviso, padx=20, pady=(0, 5))
+        label_avviso.grid_remove()
+
+        return switch, label_avviso
+
+    def _colore(self, coppia: Tuple[str, str]) -> str:
+        """
+        Sceglie il colore per il tema attivo da una coppia (chiaro, scuro).
+
+        Args:
+            coppia: I due colori, es. ("gray90", "gray13")
+
+        Returns:
+            Il colore da usare
+        """
+        return coppia[self._indice_tema]
+
+    @contextmanager
+    def _aggiornamenti_in_blocco(self) -> Iterator[None]:
+        """
+        Raggruppa più cambi di visibilità degli avvisi in un solo passaggio.
+
+        Come funziona (per principianti):
+        - Ogni grid()/grid_remove() fa ricalcolare il layout della sidebar
+        - Dentro il blocco gli avvisi vengono solo "prenotati" e applicati
+          tutti insieme all'uscita, saltando quelli già nello stato giusto
+        - I blocchi si possono annidare: applica solo quello più esterno
+        """
+        self._profondita_blocco += 1
+        try:
+            yield
+        finally:
+            self._profondita_blocco -= 1
+            if self._profondita_blocco == 0:
+                self._applica_avvisi()
+
+    def _mostra_avviso(self, label: ctk.CTkLabel, visibile: bool) -> None:
+        """
+        Mostra o nasconde un avviso sotto il relativo interruttore.
+
+        Args:
+            label: L'etichetta di avviso (con la sua riga già riservata)
+            visibile: True per mostrarla, False per nasconderla
+        """
+        self._avvisi_da_applicare[label] = visibile
+        if self._profondita_blocco == 0:
+            self._applica_avvisi()
+
+    def _applica_avvisi(self) -> None:
+        """Applica i cambi di visibilità prenotati, solo dove servono."""
+        for label, visibile in self._avvisi_da_applicare.items():
+            if visibile == bool(label.winfo_manager()):
+                continue
+            if visibile:
+                label.grid()
+            else:
+                label.grid_remove()
+        self._avvisi_da_applicare.clear()
+
+    def _pianifica_callback(self, chiave: str, callback: Optional[Callable],
+                            leggi_valore: Callable[[], object]) -> None:
+        """
+        Avvisa l'app di un cambio solo dopo RITARDO_CALLBACK_MS di calma.
+
+        Come funziona (per principianti):
+        - Ogni clic annulla la notifica precedente ancora in attesa
+        - Allo scadere si legge il valore attuale e si chiama il callback
+          solo se è diverso dall'ultimo comunicato (es. acceso e subito
+          spento = nessun lavoro per l'app)
+
+        Args:
+            chiave: Nome del controllo (es. "provider", "autorun")
+            callback: Il callback dell'app (None = nessuno da chiamare)
+            leggi_valore: Funzione che restituisce il valore attuale
+        """
+        id_after = self._after_callback.pop(chiave, None)
+        if id_after is not None:
+            self.after_cancel(id_after)
+        if callback is None:
+            return
+        self._after_callback[chiave] = self.after(
+            RITARDO_CALLBACK_MS, self._invia_callback, chiave, callback, leggi_valore
+        )
+
+    def _invia_callback(self, chiave: str, callback: Callable,
+                        leggi_valore: Callable[[], object]) -> None:
+        """Chiama il callback dell'app se il valore è davvero cambiato."""
+        self._after_callback.pop(chiave, None)
+        valore = leggi_valore()
+        if self._valori_inviati.get(chiave, _MAI_INVIATO) == valore:
+            return
+        self._valori_inviati[chiave] = valore
+        callback(valore)
 
     # ==========================================
     # Event Handler (gestori degli eventi)
@@ -372,60 +609,56 @@ class Sidebar(ctk.CTkFrame):
     def _on_cambio_provider(self) -> None:
         """Chiamato quando l'utente cambia il provider LLM."""
         provider = self._var_provider.get()
-        logger.info(f"🔄 Provider cambiato a: {provider}")
-        if self._callback_cambio_provider:
-            self._callback_cambio_provider(provider)
+        # Clic sul provider già attivo (e nessun cambio in attesa): niente da fare
+        if (self._valori_inviati.get("provider", _MAI_INVIATO) == provider
+                and "provider" not in self._after_callback):
+            return
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("🔄 Provider cambiato a: %s", provider)
+        self._pianifica_callback("provider", self._callback_cambio_provider, self._var_provider.get)
 
     def _on_toggle_autorun(self) -> None:
         """Chiamato quando l'utente attiva/disattiva auto-run."""
         attivo = self._switch_autorun.get()
-        logger.info(f"🔒 Auto-run: {'ATTIVO' if attivo else 'DISATTIVO'}")
-
-        # Mostra/nascondi avviso
-        if attivo:
-            self._label_avviso_autorun.pack(fill="x", padx=20, pady=(0, 5))
-        else:
-            self._label_avviso_autorun.pack_forget()
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("🔒 Auto-run: %s", "ATTIVO" if attivo else "DISATTIVO")
 
-        if self._callback_toggle_autorun:
-            self._callback_toggle_autorun(attivo)
+        # L'avviso cambia subito, l'app viene avvisata a clic finiti
+        self._mostra_avviso(self._label_avviso_autorun, attivo)
+        self._pianifica_callback("autorun", self._callback_toggle_autorun, self._switch_autorun.get)
 
     def _on_toggle_computer_use(self) -> None:
         """Chiamato quando l'utente attiva/disattiva il computer use."""
         attivo = self._switch_computer_use.get()
-        logger.info(f"🖱️ Computer Use: {'ATTIVO' if attivo else 'DISATTIVO'}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("🖱️ Computer Use: %s", "ATTIVO" if attivo else "DISATTIVO")
 
-        # Mostra/nascondi avviso
-        if attivo:
-            self._label_avviso_computer_use.pack(fill="x", padx=20, pady=(0, 5))
-        else:
-            self._label_avviso_computer_use.pack_forget()
-
-        if self._callback_toggle_computer_use:
-            self._callback_toggle_computer_use(attivo)
+        # L'avviso cambia subito, l'app viene avvisata a clic finiti
+        self._mostra_avviso(self._label_avviso_computer_use, attivo)
+        self._pianifica_callback("computer_use", self._callback_toggle_computer_use, self._switch_computer_use.get)
 
     def _on_toggle_vision(self) -> None:
         """Chiamato quando l'utente attiva/disattiva la vision (screenshot al modello)."""
         attivo = self._switch_vision.get()
-        logger.info(f"👁️ Vision: {'ATTIVA' if attivo else 'DISATTIVATA'}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("👁️ Vision: %s", "ATTIVA" if attivo else "DISATTIVATA")
 
-        # Mostra/nascondi avviso
-        if attivo:
-            self._label_avviso_vision.pack(fill="x", padx=20, pady=(0, 5))
-        else:
-            self._label_avviso_vision.pack_forget()
-
-        if self._callback_toggle_vision:
-            self._callback_toggle_vision(attivo)
+        # L'avviso cambia subito, l'app viene avvisata a clic finiti
+        self._mostra_avviso(self._label_avviso_vision, attivo)
+        self._pianifica_callback("vision", self._callback_toggle_vision, self._switch_vision.get)
 
     def _on_cambio_cartella(self) -> None:
         """Apre il dialogo per selezionare la cartella di lavoro."""
+        # Importato solo quando serve, per un avvio più rapido
+        from tkinter import filedialog
+
         cartella = filedialog.askdirectory(
             title="Seleziona la cartella di lavoro"
         )
         if cartella:
+            self._ultima_cartella = cartella
             self._label_cartella.configure(text=cartella)
-            logger.info(f"📂 Cartella di lavoro selezionata: {cartella}")
+            logger.info("📂 Cartella di lavoro selezionata: %s", cartella)
             if self._callback_cambio_cartella:
                 self._callback_cambio_cartella(cartella)
 
@@ -453,6 +686,9 @@ class Sidebar(ctk.CTkFrame):
 
     def _toggle_mostra_apikey(self) -> None:
         """Mostra/nasconde la API key nel campo di input."""
+        # NOTA: CTkEntry.configure(show=...) non ridisegna il widget e tiene
+        # conto del placeholder (che sul tk.Entry interno deve restare in
+        # chiaro), quindi passiamo da lì e non dall'Entry interno
         self._apikey_visibile = not self._apikey_visibile
         if self._apikey_visibile:
             self._entry_apikey.configure(show="")
@@ -472,6 +708,12 @@ class Sidebar(ctk.CTkFrame):
         Args:
             online: True se il server è raggiungibile
         """
+        if self._rimanda_se_in_costruzione(self.aggiorna_stato_server, online):
+            return
+        if online == self._ultimo_stato_server:
+            return
+        self._ultimo_stato_server = online
+
         if online:
             self._label_stato_locale.configure(
                 text="● Online",
@@ -490,7 +732,17 @@ class Sidebar(ctk.CTkFrame):
         Args:
             api_key: La API key da mostrare
         """
-        self._entry_apikey.delete(0, "end")
+        if self._rimanda_se_in_costruzione(self.imposta_apikey, api_key):
+            return
+
+        # Stessa chiave già presente: niente cancella/reinserisci
+        attuale = self._entry_apikey.get()
+        if attuale == api_key:
+            return
+        # Campo vuoto (caso tipico all'avvio): delete() riattiverebbe il
+        # placeholder solo perché insert() lo tolga subito dopo
+        if attuale:
+            self._entry_apikey.delete(0, "end")
         self._entry_apikey.insert(0, api_key)
 
     def imposta_provider(self, provider: str) -> None:
@@ -501,6 +753,9 @@ class Sidebar(ctk.CTkFrame):
             provider: "locale" o "cloud"
         """
         self._var_provider.set(provider)
+        # L'app conosce già questo valore: un nuovo clic sullo stesso
+        # provider non deve reinizializzare nulla
+        self._valori_inviati["provider"] = provider
 
     def imposta_cartella(self, cartella: str) -> None:
         """
@@ -509,7 +764,11 @@ class Sidebar(ctk.CTkFrame):
         Args:
             cartella: Percorso della cartella
         """
-        if cartella:
+        if self._rimanda_se_in_costruzione(self.imposta_cartella, cartella):
+            return
+
+        if cartella and cartella != self._ultima_cartella:
+            self._ultima_cartella = cartella
             self._label_cartella.configure(text=cartella)
 
     def imposta_autorun(self, attivo: bool) -> None:
@@ -519,12 +778,15 @@ class Sidebar(ctk.CTkFrame):
         Args:
             attivo: True per attivare, False per disattivare
         """
+        if self._rimanda_se_in_costruzione(self.imposta_autorun, attivo):
+            return
+
         if attivo:
             self._switch_autorun.select()
-            self._label_avviso_autorun.pack(fill="x", padx=20, pady=(0, 5))
         else:
             self._switch_autorun.deselect()
-            self._label_avviso_autorun.pack_forget()
+        self._mostra_avviso(self._label_avviso_autorun, attivo)
+        self._valori_inviati["autorun"] = bool(attivo)
 
     def imposta_computer_use(self, attivo: bool) -> None:
         """
@@ -533,12 +795,15 @@ class Sidebar(ctk.CTkFrame):
         Args:
             attivo: True per attivare, False per disattivare
         """
+        if self._rimanda_se_in_costruzione(self.imposta_computer_use, attivo):
+            return
+
         if attivo:
             self._switch_computer_use.select()
-            self._label_avviso_computer_use.pack(fill="x", padx=20, pady=(0, 5))
         else:
             self._switch_computer_use.deselect()
-            self._label_avviso_computer_use.pack_forget()
+        self._mostra_avviso(self._label_avviso_computer_use, attivo)
+        self._valori_inviati["computer_use"] = bool(attivo)
 
     def imposta_vision(self, attivo: bool) -> None:
         """
@@ -547,15 +812,20 @@ class Sidebar(ctk.CTkFrame):
         Args:
             attivo: True per attivare, False per disattivare
         """
+        if self._rimanda_se_in_costruzione(self.imposta_vision, attivo):
+            return
+
         if attivo:
             self._switch_vision.select()
-            self._label_avviso_vision.pack(fill="x", padx=20, pady=(0, 5))
         else:
             self._switch_vision.deselect()
-            self._label_avviso_vision.pack_forget()
+        self._mostra_avviso(self._label_avviso_vision, attivo)
+        self._valori_inviati["vision"] = bool(attivo)
 
     def ottieni_apikey(self) -> str:
         """Restituisce la API key attualmente inserita nel campo."""
+        if self._costruzione_in_corso:
+            return ""
         return self._entry_apikey.get().strip()
 
     def ottieni_provider(self) -> str:
@@ -8,14 +8,31 @@
 # - Uso memoria
 # ============================================
 
+import heapq
 import logging
-import psutil
+import time
+from bisect import bisect_right
 import customtkinter as ctk
-from typing import Optional
+from typing import Callable, List, Optional, Tuple
+
+from gui.fonts import ottieni_font
 
 # Logger per questo modulo
 logger = logging.getLogger("AutoBotOx.GUI.StatusBar")
 
+# Byte in un GB (costante, così non la ricalcoliamo ad ogni aggiornamento)
+_GB = 1 << 30
+
+# Intervallo di aggiornamento della memoria (ms): più lento se la finestra
+# non è visibile (es. minimizzata), tanto nessuno sta guardando
+INTERVALLO_MEMORIA_MS = 5000
+INTERVALLO_MEMORIA_NASCOSTA_MS = 10000
+
+# Colore dell'indicatore RAM per fascia di utilizzo:
+# sotto il 60% verde, fino all'80% arancione, oltre rosso
+_SOGLIE_MEMORIA = (60, 80)
+_COLORI_MEMORIA = ("#4caf50", "#ff9800", "#f44336")
+
 
 class StatusBar(ctk.CTkFrame):
     """
@@ -43,75 +60,134 @@ class StatusBar(ctk.CTkFrame):
             fg_color=("gray80", "gray15"),
             corner_radius=0
         )
-        self.pack_propagate(False)  # Impedisce al frame di ridimensionarsi
+        self.grid_propagate(False)  # Impedisce al frame di ridimensionarsi
+
+        # Griglia su una riga: server, modello e token a sinistra, una
+        # colonna vuota elastica (l'unica con peso) e la memoria a destra
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(3, weight=1)
+
+        # Ultimi valori mostrati dalle label: se un aggiornamento arriva con
+        # lo stesso valore il configure() (e il ridisegno) viene saltato
+        self._ultimo_online: Optional[bool] = None
+        self._ultimo_modello: Optional[str] = None
+        self._ultimo_token: Optional[str] = None
+
+        # Ultimo testo/colore mostrati per la memoria: se non cambiano
+        # evitiamo il configure() (e il ridisegno) della label
+        self._ultimo_testo_memoria: Optional[str] = None
+        self._ultimo_colore_memoria: Optional[str] = None
+
+        # La RAM totale non cambia mentre l'app è aperta: la leggiamo una
+        # volta sola, al primo aggiornamento, e la teniamo già formattata
+        self._testo_totale_gb: Optional[str] = None
+
+        # Attività periodiche: coda ordinata per scadenza di tuple
+        # (scadenza, numero progressivo, funzione). Un solo timer Tk
+        # (_after_tick) serve tutte le attività, vedi _tick()
+        self._attivita: List[Tuple[float, int, Callable[[], int]]] = []
+        self._num_attivita = 0
+        self._after_tick: Optional[str] = None
 
         # Costruisci l'interfaccia
         self._costruisci_ui()
 
         logger.info("📊 StatusBar costruita")
 
+    def destroy(self) -> None:
+        """Ferma il timer delle attività periodiche prima di distruggere la barra."""
+        if self._after_tick is not None:
+            self.after_cancel(self._after_tick)
+            self._after_tick = None
+        super().destroy()
+
     def _costruisci_ui(self) -> None:
         """Costruisce tutti gli elementi della status bar."""
 
-        # ========== STATO SERVER LOCALE ==========
-        self._frame_stato_server = ctk.CTkFrame(self, fg_color="transparent")
-        self._frame_stato_server.pack(side="left", padx=10, pady=2)
+        # Al posto dei separatori verticali (un CTkFrame ciascuno) basta
+        # un margine più ampio tra le colonne
 
+        # ========== STATO SERVER LOCALE ==========
         self._label_server = ctk.CTkLabel(
-            self._frame_stato_server,
+            self,
             text="● Server Locale: Verifica...",
-            font=ctk.CTkFont(size=11),
+            font=ottieni_font(11),
             text_color="orange"
         )
-        self._label_server.pack(side="left")
-
-        # Separatore verticale
-        self._crea_separatore()
+        self._label_server.grid(row=0, column=0, sticky="w", padx=(10, 15), pady=2)
 
         # ========== MODELLO ATTIVO ==========
         self._label_modello = ctk.CTkLabel(
             self,
             text="🤖 Modello: Nessuno",
-            font=ctk.CTkFont(size=11),
+            font=ottieni_font(11),
             text_color=("gray30", "gray70")
         )
-        self._label_modello.pack(side="left", padx=10, pady=2)
-
-        # Separatore verticale
-        self._crea_separatore()
+        self._label_modello.grid(row=0, column=1, sticky="w", padx=15, pady=2)
 
         # ========== TOKEN COUNTER ==========
         self._label_token = ctk.CTkLabel(
             self,
             text="📊 Token: 0",
-            font=ctk.CTkFont(size=11),
+            font=ottieni_font(11),
             text_color=("gray30", "gray70")
         )
-        self._label_token.pack(side="left", padx=10, pady=2)
-
-        # Separatore verticale
-        self._crea_separatore()
+        self._label_token.grid(row=0, column=2, sticky="w", padx=15, pady=2)
 
         # ========== USO MEMORIA ==========
         self._label_memoria = ctk.CTkLabel(
             self,
             text="💾 RAM: --%",
-            font=ctk.CTkFont(size=11),
+            font=ottieni_font(11),
             text_color=("gray30", "gray70")
         )
-        self._label_memoria.pack(side="right", padx=10, pady=2)
+        self._label_memoria.grid(row=0, column=4, sticky="e", padx=10, pady=2)
 
-        # Aggiorna la memoria periodicamente
-        self._aggiorna_memoria()
+        # Aggiorna la memoria periodicamente (il primo aggiornamento dopo
+        # che la finestra è stata disegnata)
+        self._aggiungi_attivita(self._aggiorna_memoria)
 
-    def _crea_separatore(self) -> None:
-        """Crea un separatore verticale nella status bar."""
-        sep = ctk.CTkFrame(
-            self,
-            width=1,
-            fg_color=("gray60", "gray40")
-        )
-        sep.pack(side="left", fill="y", padx=5, pady=4)
+    # ==========================================
+    # Attività periodiche
+    # ==========================================
+
+    def _aggiungi_attivita(self, funzione: Callable[[], int], ritardo_ms: int = 0) -> None:
+        """
+        Registra un'attività periodica della status bar.
+
+        Come funziona (per principianti):
+        - La funzione viene eseguita dopo ritardo_ms millisecondi
+        - Restituisce dopo quanti millisecondi vuole essere rieseguita
+        - Tutte le attività condividono un solo timer: invece di una catena
+          di after() per ognuna, _tick() esegue quelle scadute e riarma il
+          timer sulla scadenza più vicina
+
+        Args:
+            funzione: L'attività (restituisce i ms fino alla prossima esecuzione)
+            ritardo_ms: Attesa prima della prima esecuzione
+        """
+        self._num_attivita += 1
+        scadenza = time.monotonic() + ritardo_ms / 1000
+        heapq.heappush(self._attivita, (scadenza, self._num_attivita, funzione))
+        self._riarma_tick()
+
+    def _riarma_tick(self) -> None:
+        """Punta il timer sulla scadenza più vicina tra le attività."""
+        if self._after_tick is not None:
+            self.after_cancel(self._after_tick)
+        attesa_ms = max(0, int((self._attivita[0][0] - time.monotonic()) * 1000))
+        self._after_tick = self.after(attesa_ms, self._tick)
+
+    def _tick(self) -> None:
+        """Esegue le attività scadute e le rimette in coda."""
+        self._after_tick = None
+        adesso = time.monotonic()
+        while self._attivita and self._attivita[0][0] <= adesso:
+            _, numero, funzione = heapq.heappop(self._attivita)
+            prossima_ms = funzione()
+            heapq.heappush(self._attivita, (adesso + prossima_ms / 1000, numero, funzione))
+        if self._attivita:
+            self._riarma_tick()
 
     # ==========================================
     # Metodi pubblici per aggiornare lo stato
@@ -124,6 +200,10 @@ class StatusBar(ctk.CTkFrame):
         Args:
             online: True se il server è raggiungibile
         """
+        if online == self._ultimo_online:
+            return
+        self._ultimo_online = online
+
         if online:
             self._label_server.configure(
                 text="● Server Locale: Online",
@@ -142,6 +222,10 @@ class StatusBar(ctk.CTkFrame):
         Args:
             nome_modello: Nome del modello (es. "DeepSeek R1")
         """
+        if nome_modello == self._ultimo_modello:
+            return
+        self._ultimo_modello = nome_modello
+
         # Tronca se troppo lungo
         if len(nome_modello) > 30:
             nome_modello = nome_modello[:27] + "..."
@@ -154,35 +238,54 @@ class StatusBar(ctk.CTkFrame):
         Args:
             testo_token: Testo formattato (es. "Token: 1,234")
         """
+        if testo_token == self._ultimo_token:
+            return
+        self._ultimo_token = testo_token
         self._label_token.configure(text=f"📊 {testo_token}")
 
-    def _aggiorna_memoria(self) -> None:
+    def _aggiorna_memoria(self) -> int:
         """
         Aggiorna l'indicatore di utilizzo memoria RAM.
-        Si auto-aggiorna ogni 5 secondi.
+        Attività periodica: ogni 5 secondi (10 se la finestra non è visibile).
+
+        Returns:
+            I millisecondi fino al prossimo aggiornamento
         """
+        # Finestra minimizzata o nascosta: niente letture né ridisegni,
+        # riproviamo più tardi (la prima lettura, fatta mentre la finestra
+        # è ancora in costruzione, la eseguiamo comunque)
+        if self._ultimo_testo_memoria is not None and not self.winfo_viewable():
+            return INTERVALLO_MEMORIA_NASCOSTA_MS
+
         try:
+            # psutil viene importato solo qui (al primo giro e poi preso dalla
+            # cache di Python): caricarlo è lento e non serve per disegnare
+            # la finestra
+            import psutil
+
             # psutil.virtual_memory() ci dice quanta RAM sta usando il PC
             memoria = psutil.virtual_memory()
             percentuale = memoria.percent
-            usata_gb = memoria.used / (1024 ** 3)  # Converti in GB
-            totale_gb = memoria.total / (1024 ** 3)
-
-            # Colore basato sull'utilizzo
-            if percentuale < 60:
-                colore = "#4caf50"  # Verde
-            elif percentuale < 80:
-                colore = "#ff9800"  # Arancione
-            else:
-                colore = "#f44336"  # Rosso
+            usata_gb = memoria.used / _GB  # Converti in GB
+            if self._testo_totale_gb is None:
+                self._testo_totale_gb = f"{memoria.total / _GB:.1f}"
 
-            self._label_memoria.configure(
-                text=f"💾 RAM: {usata_gb:.1f}/{totale_gb:.1f}GB ({percentuale:.0f}%)",
-                text_color=colore
-            )
+            # Colore basato sull'utilizzo (fascia trovata con bisect)
+            colore = _COLORI_MEMORIA[bisect_right(_SOGLIE_MEMORIA, percentuale)]
+
+            testo = f"💾 RAM: {usata_gb:.1f}/{self._testo_totale_gb}GB ({percentuale:.0f}%)"
         except Exception as e:
-            logger.debug(f"⚠️ Errore lettura memoria: {e}")
-            self._label_memoria.configure(text="💾 RAM: N/D")
+            logger.debug("⚠️ Errore lettura memoria: %s", e)
+            testo, colore = "💾 RAM: N/D", self._ultimo_colore_memoria
+
+        # Riconfigura la label solo se qualcosa è cambiato davvero
+        if testo != self._ultimo_testo_memoria or colore != self._ultimo_colore_memoria:
+            if colore is None:
+                self._label_memoria.configure(text=testo)
+            else:
+                self._label_memoria.configure(text=testo, text_color=colore)
+            self._ultimo_testo_memoria = testo
+            self._ultimo_colore_memoria = colore
 
         # Ripeti ogni 5 secondi
-        self.after(5000, self._aggiorna_memoria)
+        return INTERVALLO_MEMORIA_MS
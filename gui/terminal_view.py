@@ -5,12 +5,75 @@
 # ============================================
 
 import logging
+import time
+from functools import lru_cache
 import customtkinter as ctk
-from datetime import datetime
+from typing import List, Tuple
 
 # Logger per questo modulo
 logger = logging.getLogger("AutoBotOx.GUI.TerminalView")
 
+# Ultimo secondo formattato: (secondo epoch, "HH:MM:SS")
+_ultimo_secondo = (-1, "")
+
+
+def _hhmmss() -> str:
+    """
+    Restituisce l'ora attuale come "HH:MM:SS".
+
+    Le scritture nel terminale arrivano spesso a raffiche nello stesso
+    secondo, quindi riformattiamo la stringa solo quando il secondo cambia.
+    """
+    global _ultimo_secondo
+    secondo = int(time.time())
+    if secondo != _ultimo_secondo[0]:
+        _ultimo_secondo = (secondo, time.strftime("%H:%M:%S", time.localtime(secondo)))
+    return _ultimo_secondo[1]
+
+
+# Righe massime tenute nel terminale: oltre, le più vecchie vengono
+# cancellate (un widget di testo enorme rallenta ogni scrittura e scroll).
+# Si taglia solo quando si supera il limite di MARGINE_RIGHE_TERMINALE,
+# così la cancellazione avviene a blocchi e non ad ogni scrittura
+MAX_RIGHE_TERMINALE = 5000
+MARGINE_RIGHE_TERMINALE = 500
+
+# Testi fissi del terminale
+_SEPARATORE = "─" * 50 + "\n"
+_BANNER_AVVIO = (
+    "╔══════════════════════════════════════════════════╗\n"
+    "║        AutoBot Ox - Terminale v1.0.0            ║\n"
+    "║        Pronto per eseguire comandi               ║\n"
+    "╚══════════════════════════════════════════════════╝\n\n"
+)
+_BANNER_PULITO = (
+    "╔══════════════════════════════════════════════════╗\n"
+    "║        Terminale pulito                          ║\n"
+    "╚══════════════════════════════════════════════════╝\n\n"
+)
+
+
+@lru_cache(maxsize=16)
+def _fine_intestazione_codice(linguaggio: str) -> str:
+    """
+    Parte fissa dell'intestazione del codice (dopo l'orario), es.
+    "] 💻 CODICE (PYTHON):\n". I linguaggi sono pochi e si ripetono,
+    quindi la componiamo una volta sola per linguaggio.
+    """
+    return f"] 💻 CODICE ({linguaggio.upper()}):\n"
+
+
+# Colori del terminale: ogni nome è anche un tag del widget di testo,
+# così ogni pezzo di testo mantiene il proprio colore
+_COLORI_TERMINALE = {
+    "verde": "#00ff00",
+    "bianco": "#e0e0e0",
+    "rosso": "#ff4444",
+    "giallo": "#ffeb3b",
+    "ciano": "#00bcd4",
+    "grigio": "#757575"
+}
+
 
 class TerminalView(ctk.CTkFrame):
     """
@@ -37,6 +100,13 @@ class TerminalView(ctk.CTkFrame):
 
         self.configure(fg_color="transparent")
 
+        # Righe di testo attualmente nel terminale (contando gli "\n"
+        # scritti), per sapere quando tagliare le più vecchie
+        self._righe = 0
+
+        # Scroll in fondo già pianificato per il prossimo giro di idle
+        self._scroll_pending = False
+
         # Costruisci l'interfaccia
         self._costruisci_ui()
 
@@ -86,63 +156,90 @@ class TerminalView(ctk.CTkFrame):
         )
         self._textbox.pack(fill="both", expand=True, padx=0, pady=0)
 
+        # Un tag per colore, registrato una volta sola
+        for nome, colore_hex in _COLORI_TERMINALE.items():
+            self._textbox.tag_config(nome, foreground=colore_hex)
+
         # Testo iniziale
-        self._scrivi_raw(
-            "╔══════════════════════════════════════════════════╗\n"
-            "║        AutoBot Ox - Terminale v1.0.0            ║\n"
-            "║        Pronto per eseguire comandi               ║\n"
-            "╚══════════════════════════════════════════════════╝\n\n",
-            colore="verde"
-        )
+        self._scrivi_raw(_BANNER_AVVIO, colore="verde")
 
-    def _scrivi_raw(self, testo: str, colore: str = "verde") -> None:
+    def _scrivi_blocco(self, parti: List[Tuple[str, str]], svuota: bool = False) -> None:
         """
-        Scrive testo nel terminale con il colore specificato.
-        
-        NOTA TECNICA: CTkTextbox non supporta tag colorati come tkinter.Text,
-        quindi cambiamo il text_color dell'intero widget prima di ogni inserimento.
-        Questo significa che tutto il testo avrà il colore dell'ultimo inserimento.
-        Per un terminale con colori multipli servirebbe un widget tkinter.Text nativo.
-        
-        Usiamo un approccio ibrido: il testo viene inserito con prefissi colorati
-        per dare un'indicazione visiva, anche se il colore effettivo è unico.
-        
+        Scrive più pezzi di testo nel terminale in un colpo solo.
+
+        Come funziona (per principianti):
+        - Il widget viene sbloccato, scritto e ribloccato una volta sola,
+          e scrolla in fondo una volta sola alla fine
+        - Ogni pezzo viene inserito con il tag del suo colore, quindi nel
+          terminale convivono testi di colori diversi
+        - Tutti i pezzi vanno in un'unica chiamata insert del tk.Text interno,
+          che accetta più coppie (testo, tag) insieme
+
         Args:
-            testo: Il testo da scrivere
-            colore: "verde", "bianco", "rosso", "giallo", "ciano"
+            parti: Lista di (testo, colore), colore tra "verde", "bianco",
+                   "rosso", "giallo", "ciano", "grigio" (usato come tag così
+                   com'è: deve essere uno di questi)
+            svuota: True per cancellare prima tutto il contenuto
         """
         # Abilita la scrittura temporaneamente
         self._textbox.configure(state="normal")
 
-        # Mappa colori - cambiamo il colore del testo dell'intero widget
-        # NOTA: CTkTextbox applica il colore a TUTTO il testo, non solo al nuovo
-        mappa_colori = {
-            "verde": "#00ff00",
-            "bianco": "#e0e0e0",
-            "rosso": "#ff4444",
-            "giallo": "#ffeb3b",
-            "ciano": "#00bcd4",
-            "grigio": "#757575"
-        }
-
-        colore_hex = mappa_colori.get(colore, "#00ff00")
-
-        # Aggiorna il colore del testo del widget
-        # Questo cambia il colore di TUTTO il testo nel terminale
-        self._textbox.configure(text_color=colore_hex)
+        if svuota:
+            self._textbox.delete("1.0", "end")
+            self._righe = 0
 
-        # Inserisci il testo
-        self._textbox.insert("end", testo)
+        argomenti = []
+        for testo, colore in parti:
+            argomenti.append(testo)
+            argomenti.append(colore)
+            self._righe += testo.count("\n")
+        # CTkTextbox.insert accetta un solo pezzo: usiamo il tk.Text interno
+        self._textbox._textbox.insert("end", *argomenti)
 
-        # Riporta il colore a verde (colore predefinito del terminale)
-        self._textbox.configure(text_color="#00ff00")
+        # Troppe righe: cancella le più vecchie, tornando a MAX_RIGHE_TERMINALE
+        if self._righe > MAX_RIGHE_TERMINALE + MARGINE_RIGHE_TERMINALE:
+            da_togliere = self._righe - MAX_RIGHE_TERMINALE
+            self._textbox.delete("1.0", f"{da_togliere + 1}.0")
+            self._righe = MAX_RIGHE_TERMINALE
 
         # Disabilita la scrittura
         self._textbox.configure(state="disabled")
 
         # Scrolla in basso
+        self._scroll_in_basso()
+
+    def _scroll_in_basso(self) -> None:
+        """
+        Pianifica uno scroll in fondo al prossimo giro di idle.
+
+        Più scritture ravvicinate (es. output lungo a raffica) producono
+        un solo see("end"), invece di uno per scrittura.
+        """
+        if self._scroll_pending:
+            return
+        self._scroll_pending = True
+        self.after_idle(self._esegui_scroll)
+
+    def _esegui_scroll(self) -> None:
+        """Esegue lo scroll in fondo pianificato da _scroll_in_basso()."""
+        self._scroll_pending = False
         self._textbox.see("end")
 
+    def _scrivi_raw(self, testo: str, colore: str = "verde") -> None:
+        """
+        Scrive testo nel terminale con il colore specificato.
+
+        Args:
+            testo: Il testo da scrivere
+            colore: "verde", "bianco", "rosso", "giallo", "ciano"
+                    (un colore sconosciuto diventa "verde")
+        """
+        if not testo:
+            return
+        if colore not in _COLORI_TERMINALE:
+            colore = "verde"
+        self._scrivi_blocco([(testo, colore)])
+
     def scrivi_codice(self, codice: str, linguaggio: str = "python") -> None:
         """
         Mostra del codice nel terminale con formattazione appropriata.
@@ -152,17 +249,19 @@ class TerminalView(ctk.CTkFrame):
             linguaggio: Il linguaggio di programmazione
         """
         self._num_linea += 1
-        timestamp = datetime.now().strftime("%H:%M:%S")
-
-        header = f"\n[{timestamp}] 💻 CODICE ({linguaggio.upper()}):\n"
-        separatore = "─" * 50 + "\n"
+        header = "\n[" + _hhmmss() + _fine_intestazione_codice(linguaggio)
 
-        self._scrivi_raw(header, "ciano")
-        self._scrivi_raw(separatore, "grigio")
-        self._scrivi_raw(codice + "\n", "verde")
-        self._scrivi_raw(separatore, "grigio")
+        # Il corpo (anche molto lungo) viene scritto così com'è, senza
+        # concatenargli "\n": sarebbe una copia dell'intero testo
+        self._scrivi_blocco([
+            (header, "ciano"),
+            (_SEPARATORE, "grigio"),
+            (codice, "verde"),
+            ("\n", "verde"),
+            (_SEPARATORE, "grigio"),
+        ])
 
-        logger.debug(f"🖥️ Codice scritto nel terminale ({linguaggio})")
+        logger.debug("🖥️ Codice scritto nel terminale (%s)", linguaggio)
 
     def scrivi_output(self, output: str) -> None:
         """
@@ -171,11 +270,12 @@ class TerminalView(ctk.CTkFrame):
         Args:
             output: L'output da mostrare
         """
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        header = f"[{timestamp}] 📟 OUTPUT:\n"
+        # Niente output (es. codice che non stampa nulla): niente da scrivere
+        if not output:
+            return
+        header = "[" + _hhmmss() + "] 📟 OUTPUT:\n"
 
-        self._scrivi_raw(header, "bianco")
-        self._scrivi_raw(output + "\n", "bianco")
+        self._scrivi_blocco([(header, "bianco"), (output, "bianco"), ("\n", "bianco")])
 
         logger.debug("🖥️ Output scritto nel terminale")
 
@@ -186,11 +286,11 @@ class TerminalView(ctk.CTkFrame):
         Args:
             errore: Il messaggio di errore
         """
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        header = f"\n[{timestamp}] ❌ ERRORE:\n"
+        if not errore:
+            return
+        header = "\n[" + _hhmmss() + "] ❌ ERRORE:\n"
 
-        self._scrivi_raw(header, "rosso")
-        self._scrivi_raw(errore + "\n", "rosso")
+        self._scrivi_blocco([(header, "rosso"), (errore, "rosso"), ("\n", "rosso")])
 
         logger.debug("🖥️ Errore scritto nel terminale")
 
@@ -201,7 +301,9 @@ class TerminalView(ctk.CTkFrame):
         Args:
             messaggio: Il messaggio di log
         """
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        if not messaggio:
+            return
+        timestamp = _hhmmss()
         self._scrivi_raw(f"[{timestamp}] ℹ️ {messaggio}\n", "giallo")
 
     def scrivi_stato(self, stato: str) -> None:
@@ -211,34 +313,28 @@ class TerminalView(ctk.CTkFrame):
         Args:
             stato: Il messaggio di stato
         """
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        if not stato:
+            return
+        timestamp = _hhmmss()
         self._scrivi_raw(f"[{timestamp}] 🔄 {stato}\n", "ciano")
 
     def pulisci(self) -> None:
         """Pulisce tutto il contenuto del terminale."""
-        self._textbox.configure(state="normal")
-        self._textbox.delete("1.0", "end")
-        self._textbox.configure(state="disabled")
         self._num_linea = 0
 
-        # Rimetti l'header
-        self._scrivi_raw(
-            "╔══════════════════════════════════════════════════╗\n"
-            "║        Terminale pulito                          ║\n"
-            "╚══════════════════════════════════════════════════╝\n\n",
-            colore="verde"
-        )
+        # Svuota e rimetti l'header in un solo passaggio
+        self._scrivi_blocco([(_BANNER_PULITO, "verde")], svuota=True)
         logger.info("🧹 Terminale pulito")
 
     def ottieni_contenuto(self) -> str:
         """
         Restituisce tutto il testo contenuto nel terminale.
-        Utile per l'esportazione.
+        Utile per l'esportazione (contiene solo le ultime
+        MAX_RIGHE_TERMINALE righe circa).
         
         Returns:
             Tutto il testo del terminale
         """
-        self._textbox.configure(state="normal")
-        contenuto = self._textbox.get("1.0", "end")
-        self._textbox.configure(state="disabled")
-        return contenuto
+        # La lettura funziona anche con il widget disabilitato: lo stato
+        # "normal" serve solo per scrivere
+        return self._textbox.get("1.0", "end")
@@ -13,12 +13,16 @@
 
 import sys
 import os
+import importlib.util
 
 # Aggiungi la cartella del progetto al path di Python
 # Questo permette di importare i moduli da qualsiasi posizione
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, BASE_DIR)
 
+# Il logger usa solo la libreria standard: importarlo subito costa poco
+from utils.logger import configura_logging
+
 
 def verifica_dipendenze() -> bool:
     """
@@ -43,10 +47,10 @@ def verifica_dipendenze() -> bool:
         ("PIL", "Pillow", "Gestione immagini (Vision - screenshot al modello)"),
     ]
 
+    # find_spec controlla solo che il modulo esista, senza importarlo:
+    # librerie come pyautogui impiegano anche secondi per inizializzarsi
     for nome_import, nome_pip, descrizione in dipendenze:
-        try:
-            __import__(nome_import)
-        except ImportError:
+        if importlib.util.find_spec(nome_import) is None:
             dipendenze_mancanti.append((nome_pip, descrizione))
 
     if dipendenze_mancanti:
@@ -78,16 +82,16 @@ def verifica_interpreter() -> bool:
     Returns:
         True se open-interpreter è disponibile
     """
-    try:
-        # In open-interpreter v0.1.x, l'import è diretto: import interpreter
-        import interpreter
+    # In open-interpreter v0.1.x, l'import è diretto: import interpreter.
+    # Qui controlliamo solo che esista: verrà importato davvero dalla GUI
+    if importlib.util.find_spec("interpreter") is not None:
         return True
-    except ImportError:
-        print("\n⚠️ AVVISO: 'open-interpreter' non è installato!")
-        print("   L'app si avvierà ma non potrai chattare con l'IA.")
-        print("   Installa con: pip install open-interpreter")
-        print()
-        return False
+
+    print("\n⚠️ AVVISO: 'open-interpreter' non è installato!")
+    print("   L'app si avvierà ma non potrai chattare con l'IA.")
+    print("   Installa con: pip install open-interpreter")
+    print()
+    return False
 
 
 def main():
@@ -119,7 +123,6 @@ def main():
 
     # Passo 2: Configura il logging
     print("📝 Configurazione logging...")
-    from utils.logger import configura_logging
     logger = configura_logging()
     logger.info("🚀 AutoBot Ox - Avvio applicazione")
 
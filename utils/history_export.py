@@ -5,13 +5,44 @@
 # ============================================
 
 import logging
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 # Logger per questo modulo
 logger = logging.getLogger("AutoBotOx.HistoryExport")
 
+# Ogni quanti messaggi scrivere su file i pezzi accumulati: il testo viene
+# scritto a blocchi con un solo write() invece di tante piccole scritture,
+# senza però tenere in memoria l'intero file per cronologie enormi
+MESSAGGI_PER_SCRITTURA = 1024
+
+# Buffer del file di export (1 MiB invece degli 8 KB predefiniti):
+# i blocchi accumulati arrivano al disco con poche chiamate di sistema
+BUFFER_SCRITTURA = 1 << 20
+
+# Parti fisse dell'export di testo
+_TXT_RIGA = "=" * 60 + "\n"
+_TXT_SEPARATORE = "-" * 40 + "\n\n"
+
+# Parti fisse dell'export Markdown
+_MD_UTENTE = "### 👤 Utente\n\n"
+_MD_ASSISTENTE = "### 🤖 Assistente\n\n"
+_MD_OUTPUT = "### 📟 Output Console\n\n```\n"
+_MD_FINE_BLOCCO = "\n```\n\n"
+_MD_SEPARATORE = "---\n\n"
+
+
+@lru_cache(maxsize=32)
+def _inizio_codice_md(linguaggio: str) -> str:
+    """
+    Titolo e apertura del blocco di codice Markdown per un linguaggio.
+    I linguaggi di una conversazione sono pochi (di solito python e
+    shell), quindi la stringa viene composta una volta sola per linguaggio.
+    """
+    return f"### 💻 Codice ({linguaggio})\n\n```{linguaggio}\n"
+
 
 class EsportaCronologia:
     """
@@ -22,6 +53,45 @@ class EsportaCronologia:
     - .md: Markdown, formattato con codice evidenziato
     """
 
+    @staticmethod
+    def _estrai(msg: Dict) -> Tuple[str, str, str, str, str]:
+        """
+        Legge i campi di un messaggio, qualunque sia il suo formato.
+
+        Formati supportati (per principianti):
+        - open-interpreter v0.1.x: {"role", "message", "code", "language", "output"}
+        - a blocchi: {"role", "type", "content", "format"}, dove type "code"
+          indica codice (format = linguaggio) e type "console" il suo output
+
+        Args:
+            msg: Il messaggio della cronologia
+
+        Returns:
+            Tupla (ruolo, contenuto, codice, output, linguaggio)
+        """
+        get = msg.get  # metodo preso una volta sola per messaggio
+        ruolo = get("role", "sconosciuto")
+        # "content" viene cercato solo se la chiave "message" manca
+        # (un "message" presente ma None resta None, come prima)
+        if "message" in msg:
+            contenuto = msg["message"]
+        else:
+            contenuto = get("content", "")
+        codice = get("code", "")
+        output = get("output", "")
+        linguaggio = get("language", "python")
+
+        # Formato a blocchi: il testo del blocco è codice o output, non messaggio
+        if "code" not in msg:
+            tipo = get("type")
+            if tipo == "code":
+                codice, contenuto = contenuto, ""
+                linguaggio = get("format") or linguaggio
+            elif tipo == "console":
+                output, contenuto = contenuto, ""
+
+        return ruolo, contenuto, codice, output, linguaggio
+
     @staticmethod
     def esporta_txt(messaggi: List[Dict], percorso: str) -> bool:
         """
@@ -35,38 +105,43 @@ class EsportaCronologia:
             True se l'esportazione è riuscita, False altrimenti
         """
         try:
-            with open(percorso, "w", encoding="utf-8") as f:
+            with open(percorso, "w", encoding="utf-8", buffering=BUFFER_SCRITTURA) as f:
+                # Pezzi di testo accumulati e scritti insieme con "".join
+                pezzi: List[str] = []
+
                 # Intestazione
-                f.write("=" * 60 + "\n")
-                f.write(f"  AutoBot Ox - Cronologia Chat\n")
-                f.write(f"  Data esportazione: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("=" * 60 + "\n\n")
+                pezzi.append(_TXT_RIGA)
+                pezzi.append(f"  AutoBot Ox - Cronologia Chat\n")
+                pezzi.append(f"  Data esportazione: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                pezzi.append(_TXT_RIGA + "\n")
 
                 # Messaggi
                 # NOTA: In open-interpreter v0.1.x il formato dei messaggi è:
                 # {"role": "user", "message": "..."}
                 # {"role": "assistant", "message": "...", "code": "...", "language": "...", "output": "..."}
-                for msg in messaggi:
-                    ruolo = msg.get("role", "sconosciuto").upper()
-                    # Supporta sia "message" (v0.1.x) che "content" (formato custom)
-                    contenuto = msg.get("message", msg.get("content", ""))
+                for n, msg in enumerate(messaggi, 1):
+                    ruolo, contenuto, codice, output, linguaggio = EsportaCronologia._estrai(msg)
+                    ruolo = ruolo.upper()
 
                     # Scrivi il messaggio testuale
                     if contenuto:
-                        f.write(f"[{ruolo}]\n{contenuto}\n\n")
+                        pezzi.append(f"[{ruolo}]\n{contenuto}\n\n")
 
                     # Scrivi il codice (se presente)
-                    codice = msg.get("code", "")
                     if codice:
-                        linguaggio = msg.get("language", "python")
-                        f.write(f"[{ruolo} - CODICE ({linguaggio})]\n{codice}\n\n")
+                        pezzi.append(f"[{ruolo} - CODICE ({linguaggio})]\n{codice}\n\n")
 
                     # Scrivi l'output (se presente)
-                    output = msg.get("output", "")
                     if output:
-                        f.write(f"[OUTPUT CONSOLE]\n{output}\n\n")
+                        pezzi.append(f"[OUTPUT CONSOLE]\n{output}\n\n")
 
-                    f.write("-" * 40 + "\n\n")
+                    pezzi.append(_TXT_SEPARATORE)
+
+                    if n % MESSAGGI_PER_SCRITTURA == 0:
+                        f.write("".join(pezzi))
+                        pezzi.clear()
+
+                f.write("".join(pezzi))
 
             logger.info(f"✅ Cronologia esportata in TXT: {percorso}")
             return True
@@ -88,40 +163,50 @@ class EsportaCronologia:
             True se l'esportazione è riuscita, False altrimenti
         """
         try:
-            with open(percorso, "w", encoding="utf-8") as f:
+            with open(percorso, "w", encoding="utf-8", buffering=BUFFER_SCRITTURA) as f:
+                # Pezzi di testo accumulati e scritti insieme con "".join
+                pezzi: List[str] = []
+
                 # Intestazione Markdown
-                f.write(f"# AutoBot Ox - Cronologia Chat\n\n")
-                f.write(f"**Data esportazione:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-                f.write("---\n\n")
+                pezzi.append(f"# AutoBot Ox - Cronologia Chat\n\n")
+                pezzi.append(f"**Data esportazione:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+                pezzi.append(_MD_SEPARATORE)
 
                 # Messaggi
                 # NOTA: In open-interpreter v0.1.x il formato dei messaggi è:
                 # {"role": "user", "message": "..."}
                 # {"role": "assistant", "message": "...", "code": "...", "language": "...", "output": "..."}
-                for i, msg in enumerate(messaggi, 1):
-                    ruolo = msg.get("role", "sconosciuto")
-                    # Supporta sia "message" (v0.1.x) che "content" (formato custom)
-                    contenuto = msg.get("message", msg.get("content", ""))
-                    codice = msg.get("code", "")
-                    output = msg.get("output", "")
-                    linguaggio = msg.get("language", "python")
+                for n, msg in enumerate(messaggi, 1):
+                    ruolo, contenuto, codice, output, linguaggio = EsportaCronologia._estrai(msg)
 
+                    # I testi fissi sono costanti: i testi del messaggio vengono
+                    # aggiunti come pezzi separati, senza f-string che li ricopiano
+                    # (str() lascia invariate le stringhe e converte il resto)
                     if ruolo == "user":
-                        f.write(f"### 👤 Utente\n\n{contenuto}\n\n")
+                        pezzi += (_MD_UTENTE, str(contenuto), "\n\n")
                     elif ruolo == "assistant":
                         # Messaggio testuale
                         if contenuto:
-                            f.write(f"### 🤖 Assistente\n\n{contenuto}\n\n")
+                            pezzi += (_MD_ASSISTENTE, str(contenuto), "\n\n")
                         # Codice generato
                         if codice:
-                            f.write(f"### 💻 Codice ({linguaggio})\n\n")
-                            f.write(f"```{linguaggio}\n{codice}\n```\n\n")
+                            # La cache vale solo per i nomi di linguaggio (stringhe)
+                            if isinstance(linguaggio, str):
+                                inizio_codice = _inizio_codice_md(linguaggio)
+                            else:
+                                inizio_codice = f"### 💻 Codice ({linguaggio})\n\n```{linguaggio}\n"
+                            pezzi += (inizio_codice, str(codice), _MD_FINE_BLOCCO)
                         # Output esecuzione
                         if output:
-                            f.write(f"### 📟 Output Console\n\n")
-                            f.write(f"```\n{output}\n```\n\n")
+                            pezzi += (_MD_OUTPUT, str(output), _MD_FINE_BLOCCO)
+
+                    pezzi.append(_MD_SEPARATORE)
+
+                    if n % MESSAGGI_PER_SCRITTURA == 0:
+                        f.write("".join(pezzi))
+                        pezzi.clear()
 
-                    f.write("---\n\n")
+                f.write("".join(pezzi))
 
             logger.info(f"✅ Cronologia esportata in MD: {percorso}")
             return True
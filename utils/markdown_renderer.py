@@ -20,7 +20,6 @@
 # - ```blocco``` → Blocco codice (sfondo scuro)
 # ============================================
 
-import re
 import logging
 import tkinter as tk
 from typing import List, Tuple
@@ -28,6 +27,23 @@ from typing import List, Tuple
 # Logger per questo modulo
 logger = logging.getLogger("AutoBotOx.MarkdownRenderer")
 
+# Tag degli header, indicizzati per numero di "#" meno uno
+_TAG_HEADER = ("h1", "h2", "h3")
+
+# Prefissi già pronti per le liste numerate più comuni, indicizzati per il
+# numero così come è scritto (es. "7" → "  7. "; "07" non c'è e viene composto)
+_PREFISSI_NUMERO = {str(n): f"  {n}. " for n in range(101)}
+
+# Formato inline (da _parsa_inline) → tag; "normale" usa il tag base della riga.
+# I nomi dei tag restano semplici letterali: Python li interna già da solo
+# e tkinter li converte per Tcl ad ogni chiamata comunque
+_TAG_FORMATO = {
+    "grassetto_corsivo": "grassetto_corsivo",
+    "grassetto": "grassetto",
+    "corsivo": "corsivo",
+    "codice": "codice_inline",
+}
+
 
 def configura_tag_markdown(widget_text: tk.Text, colore_testo: str = "#e0e0e0",
                            font_famiglia: str = "Segoe UI", font_size: int = 13) -> None:
@@ -41,64 +57,74 @@ def configura_tag_markdown(widget_text: tk.Text, colore_testo: str = "#e0e0e0",
         font_famiglia: Font famiglia base
         font_size: Dimensione font base
     """
+    # Stessi parametri dell'ultima volta su questo widget: i tag sono già
+    # configurati così, inutile rifare le chiamate a Tk
+    firma = (colore_testo, font_famiglia, font_size)
+    if getattr(widget_text, "_firma_tag_markdown", None) == firma:
+        return
+    widget_text._firma_tag_markdown = firma
+
+    # Metodo preso una volta sola: i tag da configurare sono tanti
+    configura = widget_text.tag_configure
+
     # Tag per testo normale
-    widget_text.tag_configure("normale", 
-                              font=(font_famiglia, font_size),
-                              foreground=colore_testo)
+    configura("normale", 
+              font=(font_famiglia, font_size),
+              foreground=colore_testo)
     
     # Tag per grassetto (**testo**)
-    widget_text.tag_configure("grassetto",
-                              font=(font_famiglia, font_size, "bold"),
-                              foreground=colore_testo)
+    configura("grassetto",
+              font=(font_famiglia, font_size, "bold"),
+              foreground=colore_testo)
     
     # Tag per corsivo (*testo*)
-    widget_text.tag_configure("corsivo",
-                              font=(font_famiglia, font_size, "italic"),
-                              foreground=colore_testo)
+    configura("corsivo",
+              font=(font_famiglia, font_size, "italic"),
+              foreground=colore_testo)
     
     # Tag per grassetto+corsivo (***testo***)
-    widget_text.tag_configure("grassetto_corsivo",
-                              font=(font_famiglia, font_size, "bold italic"),
-                              foreground=colore_testo)
+    configura("grassetto_corsivo",
+              font=(font_famiglia, font_size, "bold italic"),
+              foreground=colore_testo)
     
     # Tag per header # (grande)
-    widget_text.tag_configure("h1",
-                              font=(font_famiglia, font_size + 6, "bold"),
-                              foreground=colore_testo,
-                              spacing1=8, spacing3=4)
+    configura("h1",
+              font=(font_famiglia, font_size + 6, "bold"),
+              foreground=colore_testo,
+              spacing1=8, spacing3=4)
     
     # Tag per header ## (medio)
-    widget_text.tag_configure("h2",
-                              font=(font_famiglia, font_size + 3, "bold"),
-                              foreground=colore_testo,
-                              spacing1=6, spacing3=3)
+    configura("h2",
+              font=(font_famiglia, font_size + 3, "bold"),
+              foreground=colore_testo,
+              spacing1=6, spacing3=3)
     
     # Tag per header ### (piccolo)
-    widget_text.tag_configure("h3",
-                              font=(font_famiglia, font_size + 1, "bold"),
-                              foreground=colore_testo,
-                              spacing1=4, spacing3=2)
+    configura("h3",
+              font=(font_famiglia, font_size + 1, "bold"),
+              foreground=colore_testo,
+              spacing1=4, spacing3=2)
     
     # Tag per codice inline (`codice`)
-    widget_text.tag_configure("codice_inline",
-                              font=("Consolas", font_size - 1),
-                              foreground="#80cbc4",
-                              background="#1a1a2e")
+    configura("codice_inline",
+              font=("Consolas", font_size - 1),
+              foreground="#80cbc4",
+              background="#1a1a2e")
     
     # Tag per blocco codice (```codice```)
-    widget_text.tag_configure("codice_blocco",
-                              font=("Consolas", font_size - 1),
-                              foreground="#80cbc4",
-                              background="#1a1a2e",
-                              lmargin1=10, lmargin2=10,
-                              rmargin=10,
-                              spacing1=4, spacing3=4)
+    configura("codice_blocco",
+              font=("Consolas", font_size - 1),
+              foreground="#80cbc4",
+              background="#1a1a2e",
+              lmargin1=10, lmargin2=10,
+              rmargin=10,
+              spacing1=4, spacing3=4)
     
     # Tag per lista puntata (- elemento)
-    widget_text.tag_configure("lista",
-                              font=(font_famiglia, font_size),
-                              foreground=colore_testo,
-                              lmargin1=20, lmargin2=30)
+    configura("lista",
+              font=(font_famiglia, font_size),
+              foreground=colore_testo,
+              lmargin1=20, lmargin2=30)
 
     logger.debug("🎨 Tag markdown configurati sul widget Text")
 
@@ -107,6 +133,10 @@ def inserisci_markdown(widget_text: tk.Text, testo: str) -> None:
     """
     Inserisce testo con formattazione markdown in un widget tkinter.Text.
     I tag devono essere già configurati con configura_tag_markdown().
+
+    Tutti i pezzi (testo, tag) vengono raccolti in una lista e inseriti con
+    una sola chiamata insert: il tk.Text accetta più coppie testo/tag insieme,
+    e ogni chiamata a Tk ha un costo fisso che così si paga una volta sola.
     
     Args:
         widget_text: Il widget tkinter.Text dove inserire
@@ -114,65 +144,161 @@ def inserisci_markdown(widget_text: tk.Text, testo: str) -> None:
     """
     if not testo:
         return
-    
-    righe = testo.split("\n")
-    in_blocco_codice = False
-    
-    for i, riga in enumerate(righe):
-        # Gestione blocchi codice ```
-        if riga.strip().startswith("```"):
-            in_blocco_codice = not in_blocco_codice
-            # Non mostrare la riga ``` stessa
-            if i < len(righe) - 1 or in_blocco_codice:
-                continue
+
+    MarkdownStreamRenderer(widget_text).aggiungi(testo, ultimo=True)
+
+
+class MarkdownStreamRenderer:
+    """
+    Renderizza markdown in un widget tkinter.Text un pezzo alla volta.
+
+    Come funziona (per principianti):
+    - Durante lo streaming il testo arriva a pezzi (token) che spezzano
+      le righe a metà
+    - Ogni riga viene analizzata una volta sola, appena arriva il suo "\n":
+      il costo di ogni pezzo dipende dal pezzo, non dalla lunghezza del
+      messaggio intero
+    - L'ultima riga, ancora incompleta, resta da parte; con
+      mostra_parziale=True viene mostrata come testo semplice e sostituita
+      dalla versione formattata quando si completa
+    - Lo stato del blocco di codice (dentro/fuori ```) passa da una riga
+      all'altra
+
+    I tag devono essere già configurati con configura_tag_markdown().
+    """
+
+    # Mark del widget che segna l'inizio della riga parziale mostrata
+    _MARK_PARZIALE = "md_parziale"
+
+    def __init__(self, widget_text: tk.Text, mostra_parziale: bool = False):
+        """
+        Args:
+            widget_text: Il widget tkinter.Text dove inserire
+            mostra_parziale: True per mostrare subito anche la riga incompleta
+        """
+        self._widget = widget_text
+        self._mostra_parziale = mostra_parziale
+        self._in_blocco_codice = False
+        self._riga_parziale = ""        # Testo dopo l'ultimo "\n" ricevuto
+        self._parziale_visibile = False  # Riga parziale scritta nel widget
+
+    def aggiungi(self, testo: str, ultimo: bool = False) -> None:
+        """
+        Aggiunge un pezzo di testo markdown.
+
+        Args:
+            testo: Il nuovo pezzo (può iniziare o finire a metà riga)
+            ultimo: True se è l'ultimo pezzo: anche la riga finale viene
+                    renderizzata, seguita da "\n" come tutte le altre
+        """
+        testo = self._riga_parziale + testo
+        argomenti: List[str] = []  # testo, tag, testo, tag, ...
+
+        # Righe complete prese una alla volta con find(), senza creare la
+        # lista di tutte le righe (con testi lunghi sarebbe una copia intera)
+        inizio = 0
+        fine = testo.find("\n")
+        while fine != -1:
+            self._aggiungi_riga(argomenti, testo[inizio:fine])
+            inizio = fine + 1
+            fine = testo.find("\n", inizio)
+
+        resto = testo[inizio:]
+        if ultimo:
+            self._aggiungi_riga(argomenti, resto)
+            resto = ""
+        self._riga_parziale = resto
+
+        widget = self._widget
+        if self._parziale_visibile:
+            # La riga parziale mostrata viene sostituita (o completata)
+            widget.delete(self._MARK_PARZIALE, "end-1c")
+            self._parziale_visibile = False
+        if argomenti:
+            widget.insert("end", *argomenti)
+        if self._mostra_parziale and self._riga_parziale:
+            widget.mark_set(self._MARK_PARZIALE, "end-1c")
+            widget.mark_gravity(self._MARK_PARZIALE, "left")
+            widget.insert("end", self._riga_parziale, "normale")
+            self._parziale_visibile = True
+
+    def termina(self) -> None:
+        """Renderizza la riga finale rimasta in sospeso."""
+        self.aggiungi("", ultimo=True)
+
+    def _aggiungi_riga(self, argomenti: List[str], riga: str) -> None:
+        """
+        Aggiunge ad "argomenti" i pezzi di una riga completa, "\n" compreso.
+
+        Args:
+            argomenti: Lista testo, tag, testo, tag, ... per widget.insert()
+            riga: La riga da renderizzare (senza "\n")
+        """
+        # Spazi iniziali tolti una volta sola per riga: "pulita" serve a
+        # riconoscere blocchi, header e liste, "senza_rientro" alle liste numerate
+        senza_rientro = riga.lstrip()
+        pulita = senza_rientro.rstrip()
+        primo = pulita[:1]
+
+        # Gestione blocchi codice ```: la riga ``` stessa non viene mostrata
+        riga_recinto = primo == "`" and pulita.startswith("```")
+
+        if self._in_blocco_codice:
+            if riga_recinto:
+                # Fine del blocco
+                self._in_blocco_codice = False
             else:
-                continue
-        
-        if in_blocco_codice:
-            # Dentro un blocco codice: mostra raw con font monospace
-            widget_text.insert("end", riga + "\n", "codice_blocco")
-            continue
+                # Dentro un blocco codice: mostra raw con font monospace
+                argomenti += (riga, "codice_blocco", "\n", "codice_blocco")
+            return
+
+        if riga_recinto:
+            # Inizio del blocco
+            self._in_blocco_codice = True
+            return
         
         # Header: # ## ###
-        if riga.strip().startswith("### "):
-            testo_header = riga.strip()[4:]
-            widget_text.insert("end", testo_header + "\n", "h3")
-            continue
-        elif riga.strip().startswith("## "):
-            testo_header = riga.strip()[3:]
-            widget_text.insert("end", testo_header + "\n", "h2")
-            continue
-        elif riga.strip().startswith("# "):
-            testo_header = riga.strip()[2:]
-            widget_text.insert("end", testo_header + "\n", "h1")
-            continue
+        if primo == "#":
+            # Quanti "#" iniziali (ne bastano 4 per sapere che non è un header)
+            livello = 1
+            while livello < 4 and pulita[livello:livello + 1] == "#":
+                livello += 1
+            if livello <= 3 and pulita[livello:livello + 1] == " ":
+                tag_header = _TAG_HEADER[livello - 1]
+                argomenti += (pulita[livello + 1:], tag_header, "\n", tag_header)
+                return
         
         # Lista puntata: - elemento o * elemento
-        if riga.strip().startswith("- ") or riga.strip().startswith("* "):
-            testo_lista = riga.strip()[2:]
-            widget_text.insert("end", "  • ", "lista")
-            _inserisci_riga_formattata(widget_text, testo_lista, "lista")
-            widget_text.insert("end", "\n")
-            continue
+        elif (primo == "-" or primo == "*") and pulita[1:2] == " ":
+            testo_lista = pulita[2:]
+            argomenti += ("  • ", "lista")
+            _aggiungi_riga_formattata(argomenti, testo_lista, "lista")
+            argomenti += ("\n", "")
+            return
         
-        # Lista numerata: 1. elemento
-        match_num = re.match(r'^\s*(\d+)\.\s+(.*)', riga)
-        if match_num:
-            numero = match_num.group(1)
-            testo_lista = match_num.group(2)
-            widget_text.insert("end", f"  {numero}. ", "lista")
-            _inserisci_riga_formattata(widget_text, testo_lista, "lista")
-            widget_text.insert("end", "\n")
-            continue
+        # Lista numerata: 1. elemento (cifre, punto, almeno uno spazio)
+        elif primo.isdecimal():
+            fine_numero = 1
+            while fine_numero < len(senza_rientro) and senza_rientro[fine_numero].isdecimal():
+                fine_numero += 1
+            if senza_rientro[fine_numero:fine_numero + 1] == "." and senza_rientro[fine_numero + 1:fine_numero + 2].isspace():
+                numero = senza_rientro[:fine_numero]
+                testo_lista = senza_rientro[fine_numero + 1:].lstrip()
+                prefisso = _PREFISSI_NUMERO.get(numero) or f"  {numero}. "
+                argomenti += (prefisso, "lista")
+                _aggiungi_riga_formattata(argomenti, testo_lista, "lista")
+                argomenti += ("\n", "")
+                return
         
         # Riga normale: applica formattazione inline
-        _inserisci_riga_formattata(widget_text, riga, "normale")
-        widget_text.insert("end", "\n")
+        _aggiungi_riga_formattata(argomenti, riga, "normale")
+        argomenti += ("\n", "")
 
 
-def _inserisci_riga_formattata(widget_text: tk.Text, riga: str, tag_base: str) -> None:
+def _aggiungi_riga_formattata(argomenti: List[str], riga: str, tag_base: str) -> None:
     """
-    Inserisce una singola riga con formattazione inline (bold, italic, code).
+    Aggiunge ad "argomenti" i pezzi di una singola riga con formattazione
+    inline (bold, italic, code), come coppie testo, tag.
     
     Analizza il testo per trovare pattern markdown inline:
     - **grassetto**
@@ -180,29 +306,29 @@ def _inserisci_riga_formattata(widget_text: tk.Text, riga: str, tag_base: str) -
     - `codice`
     
     Args:
-        widget_text: Widget Text dove inserire
+        argomenti: Lista testo, tag, testo, tag, ... per widget.insert()
         riga: La riga di testo da formattare
         tag_base: Tag base per il testo non formattato
     """
     if not riga:
         return
+
+    # Nessun marker nella riga (il caso più comune, la prosa): è tutta
+    # testo base, inutile preparare lo scanner inline
+    if "*" not in riga and "`" not in riga:
+        argomenti += (riga, tag_base)
+        return
     
     # Pattern per trovare formattazione inline
     # Ordine importante: prima i pattern più lunghi (*** prima di ** prima di *)
     # Usiamo un approccio a segmenti per gestire l'annidamento
     segmenti = _parsa_inline(riga)
     
+    aggiungi = argomenti.append
+    tag_formato = _TAG_FORMATO.get
     for testo_segmento, formato in segmenti:
-        if formato == "grassetto_corsivo":
-            widget_text.insert("end", testo_segmento, "grassetto_corsivo")
-        elif formato == "grassetto":
-            widget_text.insert("end", testo_segmento, "grassetto")
-        elif formato == "corsivo":
-            widget_text.insert("end", testo_segmento, "corsivo")
-        elif formato == "codice":
-            widget_text.insert("end", testo_segmento, "codice_inline")
-        else:
-            widget_text.insert("end", testo_segmento, tag_base)
+        aggiungi(testo_segmento)
+        aggiungi(tag_formato(formato, tag_base))
 
 
 def _parsa_inline(testo: str) -> List[Tuple[str, str]]:
@@ -214,7 +340,19 @@ def _parsa_inline(testo: str) -> List[Tuple[str, str]]:
     - "corsivo" per *testo*
     - "grassetto_corsivo" per ***testo***
     - "codice" per `testo`
-    
+
+    Come funziona (per principianti):
+    - Il testo viene percorso una volta sola, saltando con find() da un
+      marker (* o `) al successivo
+    - Su un marker si cerca la sua chiusura sulla stessa riga, provando
+      prima *** poi ** poi * (come faceva la vecchia regex)
+    - Un marker senza chiusura resta testo normale, unito al testo
+      normale che lo circonda; anche segmenti attaccati dello stesso
+      formato escono come un segmento solo
+    - Le ricerche già fatte vengono riusate, così anche un testo pieno di
+      asterischi spaiati costa tempo lineare (una regex con .+? qui
+      tornerebbe indietro molte volte)
+
     Args:
         testo: Il testo da analizzare
         
@@ -222,58 +360,136 @@ def _parsa_inline(testo: str) -> List[Tuple[str, str]]:
         Lista di tuple (testo, formato)
     """
     segmenti = []
-    
-    # Regex che cattura i vari pattern inline
-    # L'ordine dei gruppi è importante: prima i pattern più specifici
-    pattern = re.compile(
-        r'(\*\*\*(.+?)\*\*\*)'   # ***grassetto corsivo***
-        r'|(\*\*(.+?)\*\*)'       # **grassetto**
-        r'|(\*(.+?)\*)'           # *corsivo*
-        r'|(`(.+?)`)'             # `codice`
-    )
-    
-    ultimo_indice = 0
-    
-    for match in pattern.finditer(testo):
-        # Testo prima del match (normale)
-        if match.start() > ultimo_indice:
-            testo_prima = testo[ultimo_indice:match.start()]
-            if testo_prima:
-                segmenti.append((testo_prima, "normale"))
-        
-        # Determina quale gruppo ha matchato
-        if match.group(2) is not None:
-            # ***grassetto corsivo***
-            segmenti.append((match.group(2), "grassetto_corsivo"))
-        elif match.group(4) is not None:
-            # **grassetto**
-            segmenti.append((match.group(4), "grassetto"))
-        elif match.group(6) is not None:
-            # *corsivo*
-            segmenti.append((match.group(6), "corsivo"))
-        elif match.group(8) is not None:
-            # `codice`
-            segmenti.append((match.group(8), "codice"))
-        
-        ultimo_indice = match.end()
-    
+    n = len(testo)
+
+    # Ultima ricerca fatta per ogni sottostringa: (inizio, fine, risultato).
+    # find() restituisce la prima occorrenza da "inizio" in poi: finché
+    # non la superiamo, una nuova ricerca da più avanti dà lo stesso risultato
+    ricerche = {}
+
+    def cerca(marker: str, inizio: int, fine: int) -> int:
+        precedente = ricerche.get(marker)
+        if precedente is not None:
+            inizio_prec, fine_prec, trovato = precedente
+            if fine == fine_prec and inizio >= inizio_prec and (trovato == -1 or trovato >= inizio):
+                return trovato
+        trovato = testo.find(marker, inizio, fine)
+        ricerche[marker] = (inizio, fine, trovato)
+        return trovato
+
+    inizio_normale = 0     # Inizio del testo normale non ancora aggiunto
+    fine_riga = -1         # Posizione del prossimo "\n" (o fine testo)
+    i = 0
+
+    while i < n:
+        # Prossimo marker: il più vicino tra * e `
+        asterisco = cerca("*", i, n)
+        apice = cerca("`", i, n)
+        if asterisco == -1:
+            i = apice
+        elif apice == -1:
+            i = asterisco
+        else:
+            i = min(asterisco, apice)
+        if i == -1:
+            break
+
+        # La chiusura va cercata sulla stessa riga
+        if i > fine_riga:
+            fine_riga = testo.find("\n", i)
+            if fine_riga == -1:
+                fine_riga = n
+
+        # Prova le chiusure dalla più lunga: (marker, formato)
+        if testo[i] == "`":
+            candidati = (("`", "codice"),)
+        elif testo.startswith("***", i):
+            candidati = (("***", "grassetto_corsivo"), ("**", "grassetto"), ("*", "corsivo"))
+        elif testo.startswith("**", i):
+            candidati = (("**", "grassetto"), ("*", "corsivo"))
+        else:
+            candidati = (("*", "corsivo"),)
+
+        for marker, formato in candidati:
+            lunghezza = len(marker)
+            # Almeno un carattere tra apertura e chiusura
+            chiusura = cerca(marker, i + lunghezza + 1, fine_riga)
+            if chiusura != -1:
+                contenuto = testo[i + lunghezza:chiusura]
+                if i > inizio_normale:
+                    segmenti.append((testo[inizio_normale:i], "normale"))
+                elif segmenti and segmenti[-1][1] == formato:
+                    # Attaccato a un segmento dello stesso formato (es.
+                    # "*a**b*"): un solo segmento, quindi un pezzo in meno
+                    contenuto = segmenti.pop()[0] + contenuto
+                segmenti.append((contenuto, formato))
+                i = inizio_normale = chiusura + lunghezza
+                break
+        else:
+            # Nessuna chiusura: il marker resta testo normale
+            i += 1
+
     # Testo dopo l'ultimo match (normale)
-    if ultimo_indice < len(testo):
-        testo_dopo = testo[ultimo_indice:]
-        if testo_dopo:
-            segmenti.append((testo_dopo, "normale"))
-    
+    if inizio_normale < n:
+        segmenti.append((testo[inizio_normale:], "normale"))
+
     # Se non ci sono match, tutto il testo è normale
     if not segmenti:
         segmenti.append((testo, "normale"))
-    
+
     return segmenti
 
 
+def _togli_marker_inline(testo: str) -> str:
+    """
+    Restituisce la riga senza i marker inline (***, **, *, `).
+
+    I marker vengono tolti un tipo alla volta, nello stesso ordine delle
+    vecchie regex (*** poi ** poi * poi `): così anche l'enfasi annidata
+    (es. "**a *b* c**" → "a b c") perde tutti i marker. Ogni passaggio è
+    una sola scansione con find(), senza regex.
+
+    Args:
+        testo: Una riga di testo (senza "\n")
+
+    Returns:
+        La riga senza marker inline
+    """
+    for marker in ("***", "**", "*", "`"):
+        inizio = testo.find(marker)
+        if inizio == -1:
+            continue
+        lunghezza = len(marker)
+        pezzi: List[str] = []
+        fatto_fino_a = 0
+        while inizio != -1:
+            # Chiusura più vicina, con almeno un carattere in mezzo: se
+            # manca qui, manca anche per tutte le aperture successive
+            chiusura = testo.find(marker, inizio + lunghezza + 1)
+            if chiusura == -1:
+                break
+            pezzi.append(testo[fatto_fino_a:inizio])
+            pezzi.append(testo[inizio + lunghezza:chiusura])
+            fatto_fino_a = chiusura + lunghezza
+            inizio = testo.find(marker, fatto_fino_a)
+        if pezzi:
+            pezzi.append(testo[fatto_fino_a:])
+            testo = "".join(pezzi)
+    return testo
+
+
 def pulisci_markdown(testo: str) -> str:
     """
     Rimuove i marker markdown da una stringa senza formattare.
     Utile per testi dove non si può usare rich text.
+
+    Come funziona (per principianti):
+    - Il testo viene letto una volta sola, riga per riga, con le stesse
+      regole di inserisci_markdown()
+    - Le righe ``` che aprono/chiudono un blocco di codice spariscono,
+      il codice al loro interno resta così com'è
+    - Dalle altre righe si toglie il prefisso degli header (#, ##, ###)
+      e poi i marker inline, anche annidati (es. "**a *b* c**" → "a b c")
     
     Args:
         testo: Testo con markdown
@@ -281,14 +497,26 @@ def pulisci_markdown(testo: str) -> str:
     Returns:
         Testo pulito senza marker markdown
     """
-    # Rimuovi headers
-    testo = re.sub(r'^#{1,3}\s+', '', testo, flags=re.MULTILINE)
-    # Rimuovi bold/italic
-    testo = re.sub(r'\*\*\*(.+?)\*\*\*', r'\1', testo)
-    testo = re.sub(r'\*\*(.+?)\*\*', r'\1', testo)
-    testo = re.sub(r'\*(.+?)\*', r'\1', testo)
-    # Rimuovi code inline
-    testo = re.sub(r'`(.+?)`', r'\1', testo)
-    # Rimuovi code blocks
-    testo = re.sub(r'```\w*\n?', '', testo)
-    return testo
+    righe_pulite: List[str] = []
+    in_blocco_codice = False
+
+    for riga in testo.split("\n"):
+        if riga.lstrip().startswith("```"):
+            in_blocco_codice = not in_blocco_codice
+            continue
+
+        if in_blocco_codice:
+            righe_pulite.append(riga)
+            continue
+
+        # Header: da 1 a 3 "#" a inizio riga seguiti da spazi
+        if riga[:1] == "#":
+            cancelletti = 1
+            while cancelletti < 4 and riga[cancelletti:cancelletti + 1] == "#":
+                cancelletti += 1
+            if cancelletti <= 3 and riga[cancelletti:cancelletti + 1].isspace():
+                riga = riga[cancelletti:].lstrip()
+
+        righe_pulite.append(_togli_marker_inline(riga))
+
+    return "\n".join(righe_pulite)
@@ -10,6 +10,9 @@ from typing import Optional
 # Logger per questo modulo
 logger = logging.getLogger("AutoBotOx.TokenCounter")
 
+# Modello del testo di ContaToken.formatta_breve()
+_FORMATO_BREVE = "Token: {totale:,} (In: {input:,} / Out: {output:,})"
+
 
 class ContaToken:
     """
@@ -25,11 +28,17 @@ class ContaToken:
     stiamo usando e non superare eventuali limiti di rate.
     """
 
+    # Solo questi attributi: niente __dict__ per istanza, accesso più rapido
+    __slots__ = ("_token_input", "_token_output", "_totale", "_richieste_totali", "_breve")
+
     def __init__(self):
         """Inizializza il contatore a zero."""
         self._token_input: int = 0        # Token inviati
         self._token_output: int = 0       # Token ricevuti
+        self._totale: int = 0             # Input + output, tenuto aggiornato
         self._richieste_totali: int = 0   # Numero di richieste fatte
+        # Testo di formatta_breve() già pronto (None = da ricalcolare)
+        self._breve: Optional[str] = None
         logger.info("📊 ContaToken inizializzato")
 
     def aggiungi(self, token_input: int = 0, token_output: int = 0) -> None:
@@ -42,10 +51,12 @@ class ContaToken:
         """
         self._token_input += token_input
         self._token_output += token_output
+        self._totale += token_input + token_output
         self._richieste_totali += 1
+        self._breve = None
         logger.debug(
-            f"📊 Token aggiunti - Input: +{token_input}, Output: +{token_output} | "
-            f"Totale sessione: {self.totale}"
+            "📊 Token aggiunti - Input: +%d, Output: +%d | Totale sessione: %d",
+            token_input, token_output, self._totale
         )
 
     @property
@@ -61,7 +72,7 @@ class ContaToken:
     @property
     def totale(self) -> int:
         """Restituisce il totale dei token (input + output)."""
-        return self._token_input + self._token_output
+        return self._totale
 
     @property
     def richieste(self) -> int:
@@ -86,7 +97,7 @@ class ContaToken:
             f"📊 Riepilogo Token Sessione:\n"
             f"   ├─ Token Input:  {self._token_input:,}\n"
             f"   ├─ Token Output: {self._token_output:,}\n"
-            f"   ├─ Token Totali: {self.totale:,}\n"
+            f"   ├─ Token Totali: {self._totale:,}\n"
             f"   ├─ Richieste:    {self._richieste_totali}\n"
             f"   └─ Parole stimate: ~{self.stima_parole():,}"
         )
@@ -95,12 +106,21 @@ class ContaToken:
         """Resetta tutti i contatori a zero."""
         self._token_input = 0
         self._token_output = 0
+        self._totale = 0
         self._richieste_totali = 0
+        self._breve = None
         logger.info("🔄 ContaToken resettato")
 
     def formatta_breve(self) -> str:
         """
         Formato breve per la status bar.
         Esempio: "Token: 1,234 (In: 500 / Out: 734)"
+
+        La status bar la chiede a ogni aggiornamento, ma i numeri cambiano
+        solo con aggiungi() o reset(): il testo viene ricomposto solo allora.
         """
-        return f"Token: {self.totale:,} (In: {self._token_input:,} / Out: {self._token_output:,})"
+        if self._breve is None:
+            self._breve = _FORMATO_BREVE.format(
+                totale=self._totale, input=self._token_input, output=self._token_output
+            )
+        return self._breve